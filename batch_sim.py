@@ -0,0 +1,303 @@
+"""Batch simulator for balancing Llama Spitter's Settings
+
+Plays many headless games with a scripted bot across a process pool, one
+Settings override and seed per run, and tabulates how each configuration
+plays out. Run from the repository root:
+
+    python batch_sim.py --set ENEMY_SPAWN_DELAY=90,120,150 --runs 50
+    python batch_sim.py --set POTION_HEAL_AMOUNT=20,40 --set DIFFICULTY_INCREASE_RATE=0.7,0.8 --csv runs.csv
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import signal
+import statistics
+import time
+
+import pygame
+
+from main import Game, ScriptedInput, Settings
+
+# Entity lists whose peak size is tracked for every run
+COUNTED = ['enemies', 'spits', 'enemy_spits', 'coins', 'potions']
+
+# Movement keys for each (x, y) step sign, and the direction the player then faces
+STEP_KEYS = {
+    (1, 0): ((pygame.K_RIGHT,), 'right'),
+    (-1, 0): ((pygame.K_LEFT,), 'left'),
+    (0, 1): ((pygame.K_DOWN,), 'down'),
+    (0, -1): ((pygame.K_UP,), 'up'),
+    (1, -1): ((pygame.K_UP, pygame.K_RIGHT), 'up-right'),
+    (-1, -1): ((pygame.K_UP, pygame.K_LEFT), 'up-left'),
+    (1, 1): ((pygame.K_DOWN, pygame.K_RIGHT), 'down-right'),
+    (-1, 1): ((pygame.K_DOWN, pygame.K_LEFT), 'down-left'),
+}
+
+# Unit velocity of a spit flying in each direction
+SPIT_VELOCITY = {
+    'right': (1, 0), 'left': (-1, 0), 'down': (0, 1), 'up': (0, -1),
+    'up-right': (0.7071, -0.7071), 'up-left': (-0.7071, -0.7071),
+    'down-right': (0.7071, 0.7071), 'down-left': (-0.7071, 0.7071),
+}
+
+
+def step_toward(dx, dy):
+    """Snap a vector to the nearest of the eight directions, as an (x, y) sign pair"""
+    # tan(22.5 degrees): closer to an axis than a diagonal
+    step_x = (dx > 0) - (dx < 0) if abs(dx) > abs(dy) * 0.414 else 0
+    step_y = (dy > 0) - (dy < 0) if abs(dy) > abs(dx) * 0.414 else 0
+    return step_x, step_y
+
+
+class BotPlayer:
+    """Scripted player that dodges enemy spits, fetches potions when hurt and shoots the nearest enemy
+
+    Used as a ScriptedInput script; `game` must be set before the first frame.
+    """
+    DODGE_RADIUS = 160
+    DODGE_WIDTH = 64
+    KEEP_AWAY = 150
+    ALIGN = 20
+    POTION_HEALTH = 50
+    POTION_RADIUS = 600
+    FIRE_INTERVAL = 8
+
+    def __init__(self):
+        self.game = None
+        self.last_fire = 0
+
+    def reset(self):
+        """Forget per-game state before a new run"""
+        self.last_fire = -self.FIRE_INTERVAL
+
+    def __call__(self, frame):
+        player = self.game.player
+        px, py = player.rect.center
+
+        threat = self.incoming_spit(px, py)
+        if threat is not None:
+            # Sidestep out of the spit's path
+            vx, vy = SPIT_VELOCITY[threat.direction]
+            ox = px - threat.rect.centerx
+            oy = py - threat.rect.centery
+            along = ox * vx + oy * vy
+            side_x, side_y = ox - along * vx, oy - along * vy
+            if abs(side_x) + abs(side_y) < 1:
+                side_x, side_y = -vy, vx
+            return self.move(side_x, side_y), ()
+
+        if player.health < self.POTION_HEALTH:
+            potion = self.nearest(self.game.potions, px, py, self.POTION_RADIUS)
+            if potion is not None:
+                return self.move(potion.rect.centerx - px, potion.rect.centery - py), ()
+
+        enemy = self.nearest(self.game.enemies, px, py)
+        if enemy is None:
+            return (), ()
+        dx = enemy.rect.centerx - px
+        dy = enemy.rect.centery - py
+        if max(abs(dx), abs(dy)) < self.KEEP_AWAY:
+            # Back off, drifting towards the middle of the world so the bot is not cornered
+            return self.move(-dx + (Settings.WORLD_WIDTH / 2 - px) * 0.2,
+                             -dy + (Settings.WORLD_HEIGHT / 2 - py) * 0.2), ()
+
+        # Spits fly straight along an axis, so line the enemy up on one before firing
+        if abs(dx) >= abs(dy):
+            aim, offset, correct = ((dx > 0) - (dx < 0), 0), dy, (0, (dy > 0) - (dy < 0))
+        else:
+            aim, offset, correct = (0, (dy > 0) - (dy < 0)), dx, ((dx > 0) - (dx < 0), 0)
+        if abs(offset) > self.ALIGN:
+            return STEP_KEYS[correct][0], ()
+        keys, direction = STEP_KEYS[aim]
+        if player.direction != direction:
+            # Turn to face the enemy; spits fly the way the player faces
+            return keys, ()
+        if frame - self.last_fire >= self.FIRE_INTERVAL:
+            self.last_fire = frame
+            return (), (pygame.K_SPACE,)
+        return (), ()
+
+    def move(self, dx, dy):
+        """Keys that move the player along (dx, dy)"""
+        return STEP_KEYS.get(step_toward(dx, dy), ((), None))[0]
+
+    def incoming_spit(self, px, py):
+        """Return the closest enemy spit within DODGE_RADIUS that is on course to hit the player"""
+        closest = None
+        closest_dist = self.DODGE_RADIUS ** 2
+        for spit in self.game.enemy_spits:
+            ox = px - spit.rect.centerx
+            oy = py - spit.rect.centery
+            dist = ox * ox + oy * oy
+            if dist >= closest_dist:
+                continue
+            vx, vy = SPIT_VELOCITY[spit.direction]
+            # Ahead of the spit and close enough to its line of flight to be hit
+            if ox * vx + oy * vy > 0 and abs(ox * vy - oy * vx) < self.DODGE_WIDTH:
+                closest = spit
+                closest_dist = dist
+        return closest
+
+    @staticmethod
+    def nearest(entities, px, py, radius=None):
+        """Return the entity whose center is closest to (px, py), optionally within radius"""
+        closest = None
+        closest_dist = float('inf') if radius is None else radius ** 2
+        for entity in entities:
+            ox = entity.rect.centerx - px
+            oy = entity.rect.centery - py
+            dist = ox * ox + oy * oy
+            if dist < closest_dist:
+                closest = entity
+                closest_dist = dist
+        return closest
+
+
+# Per-process game, built once by init_worker and reset for every run
+worker_game = None
+worker_bot = None
+
+
+def init_worker():
+    """Pool initializer: load assets and build a headless game once per process"""
+    global worker_game, worker_bot
+    worker_bot = BotPlayer()
+    worker_game = Game(headless=True, input_source=ScriptedInput(worker_bot), seed=0)
+    worker_bot.game = worker_game
+    # SDL turns SIGTERM into a quit event, which would leave Pool.terminate() waiting forever
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def run_simulation(task):
+    """Play one game with the given Settings overrides and seed, returning its result row"""
+    config, overrides, seed, max_ticks = task
+    originals = {name: getattr(Settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(Settings, name, value)
+    try:
+        game = worker_game
+        random.seed(seed)
+        game.seed = seed
+        game.init_game()
+        worker_bot.reset()
+        game.input.frame = 0
+
+        peaks = dict.fromkeys(COUNTED, 0)
+        ticks = 0
+        while game.player.alive and ticks < max_ticks:
+            game.run_frame(draw=False)
+            ticks += 1
+            for name in COUNTED:
+                peaks[name] = max(peaks[name], len(getattr(game, name)))
+    finally:
+        # Pool workers are reused, so every override must be undone
+        for name, value in originals.items():
+            setattr(Settings, name, value)
+
+    row = {
+        'config': config,
+        **overrides,
+        'seed': seed,
+        'ticks': ticks,
+        'survival_s': ticks / Settings.TICK_RATE,
+        'died': not game.player.alive,
+        'score': game.score,
+        'kills': game.enemies_killed,
+        'difficulty': game.difficulty_level,
+    }
+    row.update((f"peak_{name}", peak) for name, peak in peaks.items())
+    return row
+
+
+def parse_override(text):
+    """Parse NAME=V1,V2,... into (NAME, [values]) typed like the current Settings value"""
+    name, sep, values = text.partition('=')
+    if not sep or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE[,VALUE...], got {text!r}")
+    default = getattr(Settings, name, None)
+    if type(default) not in (int, float):
+        raise argparse.ArgumentTypeError(f"{name} is not a numeric Settings value")
+    try:
+        return name, [type(default)(value) for value in values.split(',')]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"bad value for {name}: {exc}") from None
+
+
+def make_tasks(overrides, runs, seed, max_ticks):
+    """One task per (configuration, run): the cartesian product of every override's values
+
+    Every configuration plays the same seeds, so configurations are compared game for game.
+    """
+    names = [name for name, _ in overrides]
+    combos = list(itertools.product(*(values for _, values in overrides)))
+    tasks = []
+    for config, combo in enumerate(combos):
+        for run in range(runs):
+            tasks.append((config, dict(zip(names, combo)), seed + run, max_ticks))
+    return tasks, len(combos)
+
+
+def summarize(rows, names):
+    """Print one line per configuration: means over its runs, plus the median survival"""
+    header = (' '.join(f"{name:>{max(len(name), 8)}}" for name in names) +
+              f" {'runs':>5} {'died':>5} {'surv s':>8} {'p50 s':>8} {'score':>8} {'kills':>7}"
+              f" {'enemies':>8} {'e.spits':>8} {'items':>6}")
+    print(header)
+    by_config = {}
+    for row in rows:
+        by_config.setdefault(row['config'], []).append(row)
+    for config in sorted(by_config):
+        runs = by_config[config]
+        survival = [row['survival_s'] for row in runs]
+        print(' '.join(f"{runs[0][name]:>{max(len(name), 8)}}" for name in names) +
+              f" {len(runs):>5} {sum(row['died'] for row in runs):>5}"
+              f" {statistics.mean(survival):>8.1f} {statistics.median(survival):>8.1f}"
+              f" {statistics.mean(row['score'] for row in runs):>8.0f}"
+              f" {statistics.mean(row['kills'] for row in runs):>7.1f}"
+              f" {statistics.mean(row['peak_enemies'] for row in runs):>8.1f}"
+              f" {statistics.mean(row['peak_enemy_spits'] for row in runs):>8.1f}"
+              f" {statistics.mean(row['peak_coins'] + row['peak_potions'] for row in runs):>6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Llama Spitter batch balancing simulator")
+    parser.add_argument('--set', dest='overrides', action='append', type=parse_override, default=[],
+                        metavar='NAME=V1,V2', help="Settings values to sweep (repeatable; all combinations run)")
+    parser.add_argument('--runs', type=int, default=20, help="games per configuration")
+    parser.add_argument('--seed', type=int, default=1, help="seed of each configuration's first game")
+    parser.add_argument('--max-minutes', type=float, default=10,
+                        help="end a game that survives this long (simulated minutes)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--csv', help="write one row per game to this path")
+    args = parser.parse_args()
+
+    max_ticks = int(args.max_minutes * 60 * Settings.TICK_RATE)
+    tasks, config_count = make_tasks(args.overrides, args.runs, args.seed, max_ticks)
+    names = [name for name, _ in args.overrides]
+    print(f"{len(tasks)} games ({config_count} configurations x {args.runs} runs) on {args.workers} workers")
+
+    start = time.perf_counter()
+    # Games vary a lot in length, so hand them out in small chunks to keep every worker busy
+    chunksize = max(1, len(tasks) // (args.workers * 8))
+    with multiprocessing.Pool(args.workers, initializer=init_worker) as pool:
+        rows = list(pool.imap_unordered(run_simulation, tasks, chunksize))
+    elapsed = time.perf_counter() - start
+    total_ticks = sum(row['ticks'] for row in rows)
+    print(f"Simulated {total_ticks} ticks in {elapsed:.1f}s ({total_ticks / elapsed:.0f} ticks/s)\n")
+
+    rows.sort(key=lambda row: (row['config'], row['seed']))
+    summarize(rows, names)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\nWrote {len(rows)} games to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Performance benchmarks for Llama Spitter
+
+Run from the repository root:
+
+    python benchmark.py collision
+    python benchmark.py suite --output results.json
+    python benchmark.py suite --baseline baseline.json
+    python benchmark.py startup
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import pygame
+
+from main import Coin, Enemy, Entity, Game, Potion, ScriptedInput, Settings, SpatialHash
+
+PHASES = ['update', 'collisions', 'draw', 'frame']
+
+
+def make_entities(count, size, rng):
+    """Scatter bare entities uniformly over the world"""
+    return [
+        Entity(rng.randint(0, Settings.WORLD_WIDTH - size),
+               rng.randint(0, Settings.WORLD_HEIGHT - size),
+               size, size)
+        for _ in range(count)
+    ]
+
+
+def brute_force_hits(spits, enemies):
+    """The original nested loop: every spit against every enemy collision rect"""
+    hits = []
+    for spit_idx, spit in enumerate(spits):
+        for enemy_idx, enemy in enumerate(enemies):
+            if spit.rect.colliderect(enemy.get_collision_rect()):
+                hits.append((spit_idx, enemy_idx))
+    return hits
+
+
+def spatial_hash_hits(spits, enemies, grid):
+    """Rebuild the enemy grid and test each spit only against nearby enemies"""
+    enemy_rects = [enemy.get_collision_rect() for enemy in enemies]
+    grid.clear()
+    for enemy_idx, enemy_rect in enumerate(enemy_rects):
+        grid.insert(enemy_idx, enemy_rect)
+
+    hits = []
+    for spit_idx, spit in enumerate(spits):
+        for enemy_idx in sorted(grid.query(spit.rect)):
+            if spit.rect.colliderect(enemy_rects[enemy_idx]):
+                hits.append((spit_idx, enemy_idx))
+    return hits
+
+
+def time_call(func, repeat):
+    """Return the best per-call time in milliseconds over several runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_collision(args):
+    """Compare brute-force and spatial-hash spit/enemy collision side by side"""
+    print(f"{'spits':>6} {'enemies':>8} {'brute ms':>10} {'grid ms':>10} {'speedup':>8}")
+    for spit_count, enemy_count in [(10, 100), (50, 500), (100, 1000), (200, 5000)]:
+        rng = random.Random(args.seed)
+        spits = make_entities(spit_count, Settings.SPIT_SIZE, rng)
+        enemies = make_entities(enemy_count, Settings.PLAYER_SIZE, rng)
+        grid = SpatialHash()
+
+        # Both paths must agree before their timings mean anything
+        assert brute_force_hits(spits, enemies) == spatial_hash_hits(spits, enemies, grid)
+
+        brute_ms = time_call(lambda: brute_force_hits(spits, enemies), args.repeat)
+        grid_ms = time_call(lambda: spatial_hash_hits(spits, enemies, grid), args.repeat)
+        print(f"{spit_count:>6} {enemy_count:>8} {brute_ms:>10.3f} {grid_ms:>10.3f} "
+              f"{brute_ms / grid_ms:>7.1f}x")
+
+
+def spit_every_frame(frame):
+    """Stand still and spit, rotating through all eight directions"""
+    held = [(), (pygame.K_RIGHT,), (pygame.K_DOWN,), (pygame.K_LEFT,), (pygame.K_UP,),
+            (pygame.K_UP, pygame.K_RIGHT), (pygame.K_DOWN, pygame.K_LEFT)][frame % 7]
+    return held, (pygame.K_SPACE,)
+
+
+def scatter_enemies(game, count):
+    """Place enemies at random positions across the whole world"""
+    for _ in range(count):
+        game.registry.add('enemies', Enemy(random.randint(0, Settings.WORLD_WIDTH),
+                                           random.randint(0, Settings.WORLD_HEIGHT),
+                                           game.assets, game.player))
+
+
+def setup_projectile_storm(game):
+    """A ring of fast-firing enemies on screen while the player sprays spits"""
+    center = game.player.rect.center
+    for _ in range(300):
+        enemy = Enemy(center[0] + random.randint(-550, 550),
+                      center[1] + random.randint(-400, 400),
+                      game.assets, game.player)
+        enemy.shoot_delay = 10
+        game.registry.add('enemies', enemy)
+
+
+def setup_item_littered(game):
+    """Thousands of uncollected coins and potions spread over the map"""
+    for idx in range(3000):
+        item_type = Potion if idx % Settings.ENEMIES_FOR_POTION == 0 else Coin
+        game.add_item(item_type(random.randint(0, Settings.WORLD_WIDTH),
+                                random.randint(0, Settings.WORLD_HEIGHT),
+                                game.assets))
+
+
+# name -> (setup function, input script)
+SCENARIOS = {
+    'idle': (lambda game: None, None),
+    'enemies_100': (lambda game: scatter_enemies(game, 100), None),
+    'enemies_1000': (lambda game: scatter_enemies(game, 1000), None),
+    'enemies_5000': (lambda game: scatter_enemies(game, 5000), None),
+    'projectile_storm': (setup_projectile_storm, spit_every_frame),
+    'item_littered': (setup_item_littered, None),
+}
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(0, min(len(sorted_samples) - 1, int(round(pct / 100 * len(sorted_samples))) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(samples):
+    """Reduce per-frame millisecond samples to summary statistics"""
+    ordered = sorted(samples)
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': percentile(ordered, 50),
+        'p90': percentile(ordered, 90),
+        'p99': percentile(ordered, 99),
+        'max': ordered[-1],
+    }
+
+
+def run_scenario(name, frames, warmup, seed):
+    """Run one scenario headless and return per-phase ms/frame statistics"""
+    setup, script = SCENARIOS[name]
+    game = Game(headless=True, input_source=ScriptedInput(script), seed=seed)
+    setup(game)
+
+    samples = {phase: [] for phase in PHASES}
+    for frame in range(warmup + frames):
+        # Keep the player alive so every frame exercises the full update path
+        game.player.health = Settings.PLAYER_MAX_HEALTH
+
+        game.profiler.begin_frame()
+        game.run_frame()
+        record = game.profiler.end_frame()
+
+        if frame >= warmup:
+            for phase in PHASES[:-1]:
+                samples[phase].append(record['phases'].get(phase, 0.0))
+            samples['frame'].append(record['total'])
+
+    result = {phase: summarize(values) for phase, values in samples.items()}
+    result['entities'] = {
+        'spits': len(game.spits),
+        'enemies': len(game.enemies),
+        'enemy_spits': len(game.enemy_spits),
+        'coins': len(game.coins),
+        'potions': len(game.potions),
+    }
+    return result
+
+
+def compare_to_baseline(results, baseline, threshold, min_delta_ms):
+    """Print per-phase p50 changes and return the list of regressions"""
+    regressions = []
+    print(f"\n{'scenario':<18} {'phase':<11} {'base p50':>9} {'new p50':>9} {'change':>8}")
+    for name, phases in results['scenarios'].items():
+        base_phases = baseline['scenarios'].get(name)
+        if base_phases is None:
+            continue
+        for phase in PHASES:
+            base = base_phases[phase]['p50']
+            new = phases[phase]['p50']
+            change = (new - base) / base if base > 0 else 0.0
+            flag = ''
+            # Sub-microsecond phases are too noisy to judge on ratio alone
+            if change > threshold and new - base > min_delta_ms:
+                flag = '  REGRESSION'
+                regressions.append((name, phase, change))
+            print(f"{name:<18} {phase:<11} {base:>9.3f} {new:>9.3f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def bench_suite(args):
+    """Run the scenario suite, optionally saving results and comparing to a baseline"""
+    names = args.scenario or list(SCENARIOS)
+    Settings.DIRTY_RECT_RENDERING = args.dirty_rects
+    results = {
+        'meta': {
+            'frames': args.frames,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'dirty_rects': args.dirty_rects,
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+        },
+        'scenarios': {},
+    }
+
+    print(f"{'scenario':<18} {'phase':<11} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for name in names:
+        result = run_scenario(name, args.frames, args.warmup, args.seed)
+        results['scenarios'][name] = result
+        for phase in PHASES:
+            stats = result[phase]
+            print(f"{name:<18} {phase:<11} {stats['mean']:>8.3f} {stats['p50']:>8.3f} "
+                  f"{stats['p90']:>8.3f} {stats['p99']:>8.3f} {stats['max']:>8.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} phase(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+def bench_startup(args):
+    """Report startup stage timings, time to first frame and the cost of resetting the game"""
+    if args.no_asset_cache:
+        Settings.ASSET_CACHE_DIR = None
+    game = Game(headless=True)
+    game.run_frame()
+    game.startup_timer.mark('first frame')
+    print(game.startup_timer.report())
+
+    reset_ms = []
+    for _ in range(args.resets):
+        reset_ms.append(game.init_game().total())
+    print(f"reset timing over {args.resets} resets: "
+          f"mean {sum(reset_ms) / len(reset_ms):.2f} ms, max {max(reset_ms):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Llama Spitter benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    collision = subparsers.add_parser('collision', help="spit/enemy collision: brute force vs spatial hash")
+    collision.add_argument('--seed', type=int, default=1234)
+    collision.add_argument('--repeat', type=int, default=5)
+    collision.set_defaults(func=bench_collision)
+
+    suite = subparsers.add_parser('suite', help="per-phase frame timings for the game scenarios")
+    suite.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                       help="scenario to run (repeatable, default all)")
+    suite.add_argument('--frames', type=int, default=300, help="measured frames per scenario")
+    suite.add_argument('--warmup', type=int, default=30, help="unmeasured frames before timing starts")
+    suite.add_argument('--seed', type=int, default=1234)
+    suite.add_argument('--dirty-rects', action='store_true', help="draw with the dirty-rect renderer")
+    suite.add_argument('--output', help="write machine-readable JSON results to this path")
+    suite.add_argument('--baseline', help="compare against a previously written results file")
+    suite.add_argument('--threshold', type=float, default=0.10,
+                       help="fractional p50 slowdown that counts as a regression")
+    suite.add_argument('--min-delta-ms', type=float, default=0.05,
+                       help="ignore slowdowns smaller than this many milliseconds")
+    suite.set_defaults(func=bench_suite)
+
+    startup = subparsers.add_parser('startup', help="startup stage timings and reset cost")
+    startup.add_argument('--resets', type=int, default=20)
+    startup.add_argument('--no-asset-cache', action='store_true',
+                         help="decode every asset from its source file, as a cold start would")
+    startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Prebuild the texture atlas for Llama Spitter
+
+Packs every sprite frame and the rotated and tinted projectile variants into
+assets/atlas.png with a JSON index next to it. The game builds the same atlas
+in memory when these files are missing or were built from different sources or
+settings. Run from the repository root after changing any sprite image:
+
+    python build_atlas.py
+"""
+import time
+
+import pygame
+
+from main import AssetCache, Settings, TextureAtlas
+
+
+def main():
+    start = time.perf_counter()
+    # Decode straight from the sources; the asset cache is only for the game's startup
+    cache = AssetCache(None)
+    images = {name: cache.load_image(path) for name, path in TextureAtlas.SOURCES.items()}
+    atlas = TextureAtlas.build(images)
+    atlas.save()
+
+    width, height = atlas.surface.get_size()
+    used = sum(rect.width * rect.height for rect in atlas.rects.values())
+    print(f"Packed {len(atlas.rects)} sprites into a {width}x{height} atlas "
+          f"({used / (width * height):.0%} used) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"Wrote {Settings.ATLAS_IMAGE} and {Settings.ATLAS_INDEX}")
+
+
+if __name__ == "__main__":
+    pygame.init()
+    main()
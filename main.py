@@ -1,15 +1,45 @@
+import argparse
+import collections
+import concurrent.futures
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import math
+import operator
 import pygame
+import queue
 import random
 import os
+import struct
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # The vectorised enemy engine is optional
+    np = None
+
+logger = logging.getLogger('llama_spitter')
 
 # Constants and settings
 class Settings:
     # Screen settings
     SCREEN_WIDTH = 1200
     SCREEN_HEIGHT = 900
-    WORLD_WIDTH = 3000
+    WORLD_WIDTH = 3000  # The world is rendered in chunks, so its size only costs spawn distance
     WORLD_HEIGHT = 3000
-    FPS = 60
+    FPS = 60  # Render rate cap; 0 renders as fast as possible
+    
+    # Simulation settings
+    TICK_RATE = 60  # Fixed simulation ticks per second; every frame-count timer counts these
+    MAX_TICKS_PER_FRAME = 5  # Catch-up cap so a slow frame cannot snowball
+    INTERPOLATE = True  # Draw entities between their last two simulated positions
+    
+    # World rendering settings
+    WORLD_CHUNK_SIZE = 512
+    WORLD_CHUNK_CACHE = 20  # Chunks kept rendered; a 1200x900 view touches at most 12
     
     # Player settings
     PLAYER_SPEED = 3
@@ -17,16 +47,43 @@ class Settings:
     PLAYER_SIZE = 80
     PLAYER_ANIMATION_SPEED = 0.1
     
+    # Sprite sheet settings
+    SPRITE_FRAME_SIZE = 80
+    SPRITE_FRAME_COUNT = 4
+    SPRITE_SHEET_ROWS = {'up': 0, 'left': 1, 'down': 2, 'right': 3}
+    
     # Spit settings
     SPIT_SPEED = 7
     SPIT_SIZE = 32
+    SPIT_ROTATIONS = {
+        'up': 180,
+        'up-right': 135,
+        'right': 90,
+        'down-right': 45,
+        'down': 0,
+        'down-left': 315,
+        'left': 270,
+        'up-left': 225
+    }
+    ENEMY_SPIT_TINT = (255, 0, 0)
+    SPIT_RANGE = 1500  # Pixels a spit flies before it is retired; about one screen diagonal
     
     # Enemy settings
     ENEMY_SPEED = 1
+    ENEMY_TINT = (139, 69, 19)
+    VECTORIZED_ENEMIES = True  # Use the NumPy enemy engine when NumPy is installed
     ENEMY_SPAWN_DELAY = 120
     ENEMY_SHOOT_DELAY_MIN = 120
     ENEMY_SHOOT_DELAY_MAX = 240
     
+    # Level-of-detail settings
+    LOD_MARGIN = 200  # Enemies within this distance of the view get a full update every tick
+    LOD_OFFSCREEN_INTERVAL = 4  # Enemies further out move once every this many ticks, unanimated
+    
+    # AI scheduling settings (the per-object enemy path; the NumPy engine thinks for all enemies at once)
+    AI_BUDGET_US = 2000  # Enemy think time allowed per tick before the rest dead-reckon; None for no limit
+    AI_SLICE = 32  # Enemies thought for between checks of the clock
+    
     # Sprint settings
     SPRINT_COOLDOWN = 90  # 1.5 seconds (60 frames per second * 1.5)
     SPRINT_DURATION = 18  # 0.3 seconds (60 frames per second * 0.3)
@@ -45,14 +102,248 @@ class Settings:
     DIFFICULTY_INCREASE_TIME = 1200  # 20 seconds (60 frames * 20)
     DIFFICULTY_INCREASE_RATE = 0.8  # 20% faster (multiply by 0.8)
 
+    # Asset settings
+    ASSET_CACHE_DIR = '.asset_cache'  # Decoded asset cache; None disables it
+    ATLAS_IMAGE = 'assets/atlas.png'  # Written by build_atlas.py; built in memory if missing or stale
+    ATLAS_INDEX = 'assets/atlas.json'
+    ASSET_LOAD_WORKERS = 4
+    LOADING_SCREEN_FPS = 30  # Redraw rate of the loading screen while assets decode
+    
+    # Collision settings
+    SPATIAL_CELL_SIZE = 128  # Roughly one enemy plus margin per cell
+    
+    # Rendering settings
+    CULL_MARGIN = 16  # Covers rotated spit images and item float offsets overhanging their rects
+    DIRTY_RECT_RENDERING = False  # Redraw only changed areas while the camera is still
+    HEALTH_BAR_WIDTH = 60
+    HEALTH_BAR_HEIGHT = 8
+    TEXT_CACHE_SIZE = 64  # Rendered HUD strings kept before the least recently used is evicted
+    
+    # Sound settings
+    SOUND_VOICES = 8  # Mixer channels reserved for sound effects
+    # category: (priority, most plays per frame, minimum ms between plays); higher priority
+    # sounds may steal a voice from lower ones
+    SOUND_CATEGORIES = {
+        'player_death': (3, 1, 0),
+        'death': (2, 2, 60),
+        'spit': (1, 1, 40),
+    }
+    
+    # Profiling settings
+    PROFILER_WINDOW = 120  # Frames kept for rolling averages (2 seconds)
+    TELEMETRY_SLOW_FRAMES = 20  # Slowest over-budget frames listed in the telemetry summary
+    
+    # Quality governor settings; frame cost is judged against the Settings.FPS budget.
+    # Tiers run from full quality down: enemies animate every animation_interval ticks,
+    # off-screen enemies move every LOD_OFFSCREEN_INTERVAL * offscreen_scale ticks and
+    # every draw_interval-th frame is rendered
+    QUALITY_GOVERNOR = True
+    QUALITY_WINDOW = 60  # Frames averaged per decision
+    QUALITY_DOWNGRADE = 0.9  # Drop a tier above this fraction of the budget
+    QUALITY_UPGRADE = 0.6  # Restore a tier below this fraction of the budget...
+    QUALITY_UPGRADE_WINDOWS = 3  # ...for this many windows in a row
+    QUALITY_TIERS = [
+        {'name': 'high', 'animation_interval': 1, 'item_float': True, 'sound_voices': 8,
+         'offscreen_scale': 1, 'draw_interval': 1},
+        {'name': 'medium', 'animation_interval': 2, 'item_float': True, 'sound_voices': 6,
+         'offscreen_scale': 2, 'draw_interval': 1},
+        {'name': 'low', 'animation_interval': 4, 'item_float': False, 'sound_voices': 4,
+         'offscreen_scale': 4, 'draw_interval': 1},
+        {'name': 'minimum', 'animation_interval': 4, 'item_float': False, 'sound_voices': 2,
+         'offscreen_scale': 4, 'draw_interval': 2},
+    ]
+
+
+class AssetCache:
+    """On-disk cache of decoded sounds (raw PCM) and images (raw RGBA), keyed by source file hash"""
+    VERSION = 1
+    IMAGE_HEADER = struct.Struct('<II')  # width, height
+    
+    def __init__(self, directory):
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            
+    def cache_path(self, path, variant):
+        """Return where the decoded form of a source file lives in the cache"""
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read())
+        digest.update(f"{self.VERSION}:{variant}".encode())
+        return os.path.join(self.directory, digest.hexdigest() + '.bin')
+        
+    def read(self, cache_path):
+        """Return cached bytes, or None if missing or unreadable"""
+        try:
+            with open(cache_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+            
+    def write(self, cache_path, data):
+        """Store bytes atomically so concurrent loaders never see a partial file"""
+        temp_path = f"{cache_path}.{os.getpid()}.{id(data)}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass  # The cache is only an optimisation
+            
+    def load_sound(self, path):
+        """Load a sound, decoding it only if no PCM for the current mixer format is cached"""
+        if self.directory is None:
+            return pygame.mixer.Sound(path)
+        # Raw PCM is only valid for the mixer format it was decoded for
+        cache_path = self.cache_path(path, f"pcm{pygame.mixer.get_init()}")
+        data = self.read(cache_path)
+        if data is not None:
+            return pygame.mixer.Sound(buffer=data)
+        sound = pygame.mixer.Sound(path)
+        self.write(cache_path, sound.get_raw())
+        return sound
+        
+    def load_image(self, path):
+        """Load an image, decoding the file only if no raw pixels are cached"""
+        if self.directory is None:
+            return pygame.image.load(path)
+        cache_path = self.cache_path(path, 'rgba')
+        data = self.read(cache_path)
+        if data is not None:
+            size = self.IMAGE_HEADER.unpack_from(data)
+            return pygame.image.frombytes(data[self.IMAGE_HEADER.size:], size, 'RGBA')
+        image = pygame.image.load(path)
+        self.write(cache_path, self.IMAGE_HEADER.pack(*image.get_size()) +
+                   pygame.image.tobytes(image, 'RGBA'))
+        return image
+
+
+class TextureAtlas:
+    """Every sprite variant the game draws, packed into one surface with a name -> area rect index
+    
+    build() renders the frames and the rotated and tinted variants from the source
+    images. build_atlas.py saves the result ahead of time so startup decodes a single
+    image; the index records a key over the sources and settings so a stale atlas is
+    never used.
+    """
+    VERSION = 1
+    SOURCES = {
+        'player_sheet': 'assets/player_sheet.png',
+        'spit': 'assets/spit.png',
+        'coin': 'assets/goldcoin.png',
+        'potion': 'assets/potion.png',
+    }
+    WIDTH = 1024
+    PADDING = 1  # Transparent gap so neighbouring sprites never bleed into each other
+    
+    def __init__(self, surface, rects):
+        self.surface = surface
+        self.rects = rects
+        
+    @classmethod
+    def source_key(cls):
+        """Digest of the source images and every setting that shapes the variants"""
+        digest = hashlib.sha1(repr((
+            cls.VERSION, Settings.SPRITE_FRAME_SIZE, Settings.SPRITE_FRAME_COUNT,
+            sorted(Settings.SPRITE_SHEET_ROWS.items()), sorted(Settings.SPIT_ROTATIONS.items()),
+            Settings.ENEMY_TINT, Settings.ENEMY_SPIT_TINT,
+        )).encode())
+        for path in cls.SOURCES.values():
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+        
+    @staticmethod
+    def tint(surface, color):
+        """Return a multiplied-colour copy of a surface"""
+        tinted_surface = surface.copy()
+        tinted_surface.fill(color, special_flags=pygame.BLEND_MULT)
+        return tinted_surface
+        
+    @classmethod
+    def render_variants(cls, images):
+        """Return {name: surface} for every sprite variant, from the source images by SOURCES name"""
+        variants = {}
+        size = Settings.SPRITE_FRAME_SIZE
+        sheet = images['player_sheet']
+        for direction, row in Settings.SPRITE_SHEET_ROWS.items():
+            for col in range(Settings.SPRITE_FRAME_COUNT):
+                frame = sheet.subsurface(pygame.Rect(col * size, row * size, size, size))
+                variants[f"player/{direction}/{col}"] = frame
+                variants[f"enemy/{direction}/{col}"] = cls.tint(frame, Settings.ENEMY_TINT)
+                
+        for direction, rotation in Settings.SPIT_ROTATIONS.items():
+            spit_image = pygame.transform.rotate(images['spit'], rotation)
+            variants[f"spit/{direction}"] = spit_image
+            variants[f"enemy_spit/{direction}"] = cls.tint(spit_image, Settings.ENEMY_SPIT_TINT)
+            
+        variants['coin'] = images['coin']
+        variants['potion'] = images['potion']
+        return variants
+        
+    @classmethod
+    def build(cls, images):
+        """Render the variants and shelf-pack them, tallest first, into a new atlas"""
+        variants = cls.render_variants(images)
+        order = sorted(variants, key=lambda name: -variants[name].get_height())
+        rects = {}
+        x = y = shelf_height = 0
+        for name in order:
+            width, height = variants[name].get_size()
+            if x + width > cls.WIDTH:
+                x = 0
+                y += shelf_height + cls.PADDING
+                shelf_height = 0
+            rects[name] = pygame.Rect(x, y, width, height)
+            x += width + cls.PADDING
+            shelf_height = max(shelf_height, height)
+            
+        surface = pygame.Surface((cls.WIDTH, y + shelf_height), pygame.SRCALPHA)
+        for name, rect in rects.items():
+            # MAX onto the transparent atlas copies pixels exactly, where a normal blit would blend alpha
+            surface.blit(variants[name], rect, special_flags=pygame.BLEND_RGBA_MAX)
+        return cls(surface, rects)
+        
+    @classmethod
+    def load(cls, cache):
+        """Load the prebuilt atlas, or return None if it is missing or out of date"""
+        try:
+            with open(Settings.ATLAS_INDEX) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get('key') != cls.source_key():
+            return None
+        rects = {name: pygame.Rect(rect) for name, rect in index['sprites'].items()}
+        # The image is a separate build output, so it may be missing or broken on its own
+        try:
+            surface = cache.load_image(Settings.ATLAS_IMAGE)
+        except (OSError, ValueError, pygame.error):
+            return None
+        if not all(surface.get_rect().contains(rect) for rect in rects.values()):
+            return None
+        return cls(surface, rects)
+        
+    def save(self):
+        """Write the atlas image and its index"""
+        pygame.image.save(self.surface, Settings.ATLAS_IMAGE)
+        index = {
+            'key': self.source_key(),
+            'size': list(self.surface.get_size()),
+            'sprites': {name: list(rect) for name, rect in sorted(self.rects.items())},
+        }
+        with open(Settings.ATLAS_INDEX, 'w') as f:
+            json.dump(index, f, indent=1)
+            
+    def get(self, name):
+        """Return a sprite as a subsurface sharing the atlas pixels"""
+        return self.surface.subsurface(self.rects[name])
+
 
 class AssetManager:
     """Class to manage and load all game assets"""
     def __init__(self):
-        self.player_sheet = None
-        self.enemy_sheet = None
+        self.atlas = None
         self.background_image = None
-        self.spit_image = None
         self.coin_image = None
         self.potion_image = None
         self.spit_sounds = []
@@ -61,38 +352,542 @@ class AssetManager:
         self.sad_trombone = None
         self.bg_music = None
         
-    def load_assets(self):
-        """Load all game assets"""
-        # Load images
-        self.player_sheet = pygame.image.load('assets/player_sheet.png')
-        self.enemy_sheet = pygame.image.load('assets/player_sheet.png')  # Using same sheet for now
-        self.background_image = pygame.image.load('assets/background.png')
-        self.spit_image = pygame.image.load('assets/spit.png')
-        self.coin_image = pygame.image.load('assets/goldcoin.png')
-        self.potion_image = pygame.image.load('assets/potion.png')
-        
-        # Load sounds
-        self.spit_sounds = [
-            pygame.mixer.Sound('assets/spit1.mp3'),
-            pygame.mixer.Sound('assets/spit2.mp3'),
-            pygame.mixer.Sound('assets/spit3.mp3')
-        ]
-        self.death_sounds = [
-            pygame.mixer.Sound('assets/llama_death1.mp3'),
-            pygame.mixer.Sound('assets/llama_death2.mp3'),
-            pygame.mixer.Sound('assets/llama_death3.mp3')
-        ]
-        self.player_death_sound = pygame.mixer.Sound('assets/llama-death.mp3')
-        self.sad_trombone = pygame.mixer.Sound('assets/sadtrombone.mp3')
-        self.bg_music = 'assets/background-music.mp3'
+        # Sound choices are cosmetic, so they never draw from the seeded simulation RNG
+        self.rng = random.Random()
+        
+        # Decode jobs of the load in progress, for reporting progress
+        self.loads = []
+        
+        # Prebuilt sprite variants, filled by build_sprite_cache
+        self.player_frames = {}
+        self.enemy_frames = {}
+        self.spit_images = {}
+        self.enemy_spit_images = {}
+        
+    def decode_assets(self):
+        """Decode every asset file, in parallel through the asset cache
+        
+        Safe to run off the main thread; the mixer must already be initialised. The
+        images still need prepare_images on the main thread before they are drawn.
+        """
+        cache = AssetCache(Settings.ASSET_CACHE_DIR)
+        self.loads = []
+        with concurrent.futures.ThreadPoolExecutor(Settings.ASSET_LOAD_WORKERS) as pool:
+            def submit(func, *args):
+                future = pool.submit(func, *args)
+                self.loads.append(future)
+                return future
+                
+            def image(path):
+                return submit(cache.load_image, path)
+                
+            def sound(path):
+                return submit(cache.load_sound, path)
+                
+            # Load images; sprites come from the atlas, the tiled background stays separate
+            atlas = submit(self.load_atlas, cache)
+            background_image = image('assets/background.png')
+            
+            # Load sounds
+            spit_sounds = [
+                sound('assets/spit1.mp3'),
+                sound('assets/spit2.mp3'),
+                sound('assets/spit3.mp3')
+            ]
+            death_sounds = [
+                sound('assets/llama_death1.mp3'),
+                sound('assets/llama_death2.mp3'),
+                sound('assets/llama_death3.mp3')
+            ]
+            player_death_sound = sound('assets/llama-death.mp3')
+            sad_trombone = sound('assets/sadtrombone.mp3')
+            
+        self.atlas = atlas.result()
+        self.background_image = background_image.result()
+        self.spit_sounds = [future.result() for future in spit_sounds]
+        self.death_sounds = [future.result() for future in death_sounds]
+        self.player_death_sound = player_death_sound.result()
+        self.sad_trombone = sad_trombone.result()
+        self.bg_music = 'assets/background-music.mp3'  # Streamed, so never decoded up front
+        
+    def load_progress(self):
+        """Return the fraction of the current decode jobs that have finished"""
+        loads = self.loads
+        if not loads:
+            return 0.0
+        return sum(future.done() for future in loads) / len(loads)
+        
+    def prepare_images(self):
+        """Convert the decoded images and build the sprite cache; main thread only"""
+        self.convert_images()
+        self.build_sprite_cache()
+        
+    def load_atlas(self, cache):
+        """Load the prebuilt texture atlas, building it in memory if it is missing or stale"""
+        atlas = TextureAtlas.load(cache)
+        if atlas is None:
+            logger.info("Texture atlas missing or out of date, building it in memory "
+                        "(run build_atlas.py to prebuild it)")
+            images = {name: cache.load_image(path) for name, path in TextureAtlas.SOURCES.items()}
+            atlas = TextureAtlas.build(images)
+        return atlas
+        
+    def convert_images(self):
+        """Convert loaded images to the display's pixel format so blits skip conversion"""
+        if pygame.display.get_surface() is None:
+            return  # Conversion needs an open display
+        self.background_image = self.background_image.convert()
+        self.atlas.surface = self.atlas.surface.convert_alpha()
+        
+    def build_sprite_cache(self):
+        """Look up every sprite variant in the atlas so draws never allocate"""
+        atlas = self.atlas
+        self.player_frames = {}
+        self.enemy_frames = {}
+        for direction in Settings.SPRITE_SHEET_ROWS:
+            frames = range(Settings.SPRITE_FRAME_COUNT)
+            self.player_frames[direction] = [atlas.get(f"player/{direction}/{col}") for col in frames]
+            self.enemy_frames[direction] = [atlas.get(f"enemy/{direction}/{col}") for col in frames]
+            
+        for direction in Settings.SPIT_ROTATIONS:
+            self.spit_images[direction] = atlas.get(f"spit/{direction}")
+            self.enemy_spit_images[direction] = atlas.get(f"enemy_spit/{direction}")
+            # Diagonal directions use the primary direction's animation
+            if '-' in direction:
+                primary = direction.split('-')[0]
+                self.player_frames[direction] = self.player_frames[primary]
+                self.enemy_frames[direction] = self.enemy_frames[primary]
+                
+        self.coin_image = atlas.get('coin')
+        self.potion_image = atlas.get('potion')
+
+
+class KeyState:
+    """Stand-in for pygame.key.get_pressed() backed by a set of held keys"""
+    def __init__(self, held=()):
+        self.held = frozenset(held)
         
-    def get_random_spit_sound(self):
-        """Return a random spit sound"""
-        return random.choice(self.spit_sounds)
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class LiveInput:
+    """Input source that reads the real keyboard and event queue"""
+    def get_events(self):
+        """Return this frame's pygame events"""
+        return pygame.event.get()
+        
+    def get_pressed(self):
+        """Return the current keyboard state"""
+        return pygame.key.get_pressed()
+
+
+class ScriptedInput:
+    """Input source that plays synthetic key presses instead of the keyboard
     
-    def get_random_death_sound(self):
-        """Return a random death sound"""
-        return random.choice(self.death_sounds)
+    `script` is called with the frame number and returns (held_keys, pressed_keys):
+    the keys held down during that frame and the keys that send a KEYDOWN event.
+    """
+    def __init__(self, script=None):
+        self.script = script
+        self.frame = 0
+        self.keys = KeyState()
+        
+    def get_events(self):
+        """Advance the script one frame and return its KEYDOWN events"""
+        held, pressed = self.script(self.frame) if self.script else ((), ())
+        self.frame += 1
+        self.keys = KeyState(held)
+        return [pygame.event.Event(pygame.KEYDOWN, key=key) for key in pressed]
+        
+    def get_pressed(self):
+        """Return the keys held for the current scripted frame"""
+        return self.keys
+
+
+# Movement keys cycled through by wander_script, 90 frames each
+WANDER_PATTERN = [
+    (pygame.K_RIGHT,),
+    (pygame.K_DOWN, pygame.K_LSHIFT),
+    (pygame.K_LEFT,),
+    (pygame.K_UP, pygame.K_LEFT),
+    (),
+    (pygame.K_UP, pygame.K_RIGHT),
+]
+
+
+def wander_script(frame):
+    """Synthetic input that wanders around the world and spits at a steady rate"""
+    held = WANDER_PATTERN[(frame // 90) % len(WANDER_PATTERN)]
+    pressed = (pygame.K_SPACE,) if frame % 15 == 0 else ()
+    return held, pressed
+
+
+class StageTimer:
+    """Measures the named stages of a one-off operation such as startup or reset"""
+    def __init__(self, name):
+        self.name = name
+        self.stages = []
+        self.start = time.perf_counter()
+        self.last = self.start
+        
+    def mark(self, stage):
+        """Record the time since the previous mark as a stage, in ms"""
+        now = time.perf_counter()
+        self.stages.append((stage, (now - self.last) * 1000))
+        self.last = now
+        
+    def total(self):
+        """Return the ms elapsed from creation to the last mark"""
+        return (self.last - self.start) * 1000
+        
+    def report(self):
+        """Return a human readable per-stage breakdown"""
+        lines = [f"{self.name} timing: {self.total():.1f} ms"]
+        lines.extend(f"  {stage:<16} {ms:8.1f} ms" for stage, ms in self.stages)
+        return "\n".join(lines)
+
+
+class FrameProfiler:
+    """Records per-frame phase timings and entity counts over a rolling window"""
+    def __init__(self, window=Settings.PROFILER_WINDOW):
+        self.history = collections.deque(maxlen=window)
+        self.frame_index = 0
+        self.frame_start = time.perf_counter()
+        self.phases = {}
+        self.counts = {}
+        
+    def begin_frame(self):
+        """Start timing a new frame"""
+        self.frame_start = time.perf_counter()
+        self.phases = {}
+        self.counts = {}
+        
+    def add(self, phase, start):
+        """Add the time elapsed since start (a perf_counter value) to a phase, in ms"""
+        elapsed = (time.perf_counter() - start) * 1000
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+        
+    def set_counts(self, **counts):
+        """Record entity counts for the current frame"""
+        self.counts.update(counts)
+        
+    def end_frame(self):
+        """Close the current frame and return its record"""
+        record = {
+            'frame': self.frame_index,
+            'total': (time.perf_counter() - self.frame_start) * 1000,
+            'phases': self.phases,
+            'counts': self.counts,
+        }
+        self.history.append(record)
+        self.frame_index += 1
+        return record
+        
+    def averages(self):
+        """Return the mean ms per phase (and 'total') over the rolling window"""
+        if not self.history:
+            return {}
+        sums = {'total': 0.0}
+        for record in self.history:
+            sums['total'] += record['total']
+            for phase, ms in record['phases'].items():
+                sums[phase] = sums.get(phase, 0.0) + ms
+        return {phase: ms / len(self.history) for phase, ms in sums.items()}
+        
+    def percentile(self, pct, phase='total'):
+        """Return a nearest-rank percentile of frame (or phase) time over the window"""
+        if not self.history:
+            return 0.0
+        if phase == 'total':
+            samples = sorted(record['total'] for record in self.history)
+        else:
+            samples = sorted(record['phases'].get(phase, 0.0) for record in self.history)
+        rank = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+        return samples[rank]
+        
+    def latest_counts(self):
+        """Return the entity counts from the most recent complete frame"""
+        return self.history[-1]['counts'] if self.history else {}
+
+
+class LatencyHistogram:
+    """Counts millisecond samples in logarithmic buckets, HDR histogram style
+    
+    Each bucket is GROWTH times wider than the last, so any percentile is accurate to
+    within that ratio while memory stays bounded however long the session runs.
+    """
+    GROWTH = 1.01
+    MIN_MS = 0.001
+    
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.count = 0
+        self.max = 0.0
+        
+    def add(self, ms):
+        """Record one sample"""
+        self.counts[int(math.log(max(ms, self.MIN_MS) / self.MIN_MS, self.GROWTH))] += 1
+        self.count += 1
+        self.max = max(self.max, ms)
+        
+    def percentile(self, pct):
+        """Return the nearest-rank percentile, as the upper edge of its bucket"""
+        rank = max(1, int(round(pct / 100 * self.count)))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.MIN_MS * self.GROWTH ** (bucket + 1), self.max)
+        return self.max
+        
+    def summary(self):
+        """Return p50/p90/p99/max in ms"""
+        return {'p50': self.percentile(50), 'p90': self.percentile(90),
+                'p99': self.percentile(99), 'max': self.max}
+
+
+class TelemetryWriter:
+    """Streams per-frame records to a JSON-lines or CSV file from a background thread
+    
+    The game loop only queues a row; the writer thread does the formatting, the file
+    I/O and the histograms, so a slow disk never stalls a frame. A frame's cost is
+    its time excluding the frame cap's sleep, judged against the Settings.FPS budget.
+    """
+    PHASES = ('events', 'update', 'collisions', 'audio', 'draw', 'tick')
+    COLUMNS = ('frame', 'total') + PHASES + (
+        'difficulty_level', 'spawn_delay', 'quality_tier', 'spits', 'enemies', 'enemy_spits', 'coins', 'potions')
+    
+    def __init__(self, path):
+        self.path = path
+        self.format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        self.budget = 1000 / Settings.FPS if Settings.FPS else None
+        self.histograms = {name: LatencyHistogram() for name in ('frame',) + self.PHASES}
+        self.over_budget = []
+        self.frames = 0
+        self.rows = queue.Queue()
+        self.file = open(path, 'w', newline='')
+        self.thread = threading.Thread(target=self.drain, name='telemetry', daemon=True)
+        self.thread.start()
+        
+    def write(self, game, record):
+        """Queue one frame's profiler record along with the game state it ended in"""
+        phases = record['phases']
+        self.rows.put_nowait((record['frame'], record['total']) +
+                             tuple(phases.get(phase, 0.0) for phase in self.PHASES) +
+                             (game.difficulty_level, game.spawn_delay, game.quality_tier,
+                              len(game.spits), len(game.enemies),
+                              len(game.enemy_spits), len(game.coins), len(game.potions)))
+        
+    def drain(self):
+        """Writer thread: format and write queued rows until the None sentinel arrives"""
+        if self.format == 'csv':
+            writer = csv.writer(self.file)
+            writer.writerow(self.COLUMNS)
+            write_row = writer.writerow
+        else:
+            write_row = lambda row: self.file.write(json.dumps(dict(zip(self.COLUMNS, row))) + '\n')
+        tick_index = self.COLUMNS.index('tick')
+        while True:
+            row = self.rows.get()
+            if row is None:
+                break
+            write_row(row)
+            
+            frame_ms = row[1] - row[tick_index]
+            self.histograms['frame'].add(frame_ms)
+            for index, phase in enumerate(self.PHASES, 2):
+                self.histograms[phase].add(row[index])
+            if self.budget is not None and frame_ms > self.budget:
+                self.over_budget.append((row[0], frame_ms))
+            self.frames += 1
+        self.file.close()
+        
+    def close(self):
+        """Finish writing and return the end-of-session summary"""
+        if self.thread.is_alive():
+            self.rows.put(None)
+            self.thread.join()
+        return self.summary()
+        
+    def summary(self):
+        """Return a human readable latency histogram and the slowest over-budget frames"""
+        lines = [f"telemetry: {self.frames} frames written to {self.path}",
+                 f"  {'phase':<11} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"]
+        for name, histogram in self.histograms.items():
+            if histogram.max > 0:
+                stats = histogram.summary()
+                lines.append(f"  {name:<11} " + " ".join(f"{stats[key]:8.3f}" for key in ('p50', 'p90', 'p99', 'max')))
+        if self.budget is not None:
+            lines.append(f"  {len(self.over_budget)} frames over the {self.budget:.1f} ms budget")
+            slowest = sorted(self.over_budget, key=lambda frame: frame[1], reverse=True)
+            for frame, ms in slowest[:Settings.TELEMETRY_SLOW_FRAMES]:
+                lines.append(f"    frame {frame:>7} {ms:8.3f} ms")
+        return "\n".join(lines)
+
+
+class QualityGovernor:
+    """Steps through Settings.QUALITY_TIERS to keep frames within the Settings.FPS budget
+    
+    Frame cost (excluding the frame cap's sleep) is averaged over windows of
+    Settings.QUALITY_WINDOW frames. A window over QUALITY_DOWNGRADE of the budget drops a
+    tier at once; restoring one takes QUALITY_UPGRADE_WINDOWS windows in a row whose cost,
+    projected to the better tier's draw rate, is under QUALITY_UPGRADE. Projecting keeps
+    a frame-skipping tier's cheap skipped frames from tempting the governor back up to a
+    tier that is over budget, so it does not flap between two tiers.
+    """
+    def __init__(self):
+        self.tier = 0
+        self.window_ms = 0.0
+        self.window_draw_ms = 0.0
+        self.window_frames = 0
+        self.window_draws = 0
+        self.good_windows = 0
+        # Session statistics for report()
+        self.changes = 0
+        self.tier_ms = [0.0] * len(Settings.QUALITY_TIERS)
+        
+    def observe(self, record):
+        """Add a finished frame's profiler record, returning the new tier or None if unchanged"""
+        self.tier_ms[self.tier] += record['total']
+        if not Settings.FPS:
+            return None
+        phases = record['phases']
+        self.window_ms += record['total'] - phases.get('tick', 0.0)
+        self.window_frames += 1
+        if 'draw' in phases:
+            self.window_draw_ms += phases['draw']
+            self.window_draws += 1
+        if self.window_frames < Settings.QUALITY_WINDOW:
+            return None
+        average = self.window_ms / self.window_frames
+        projected = self.projected_cost(self.tier - 1) if self.tier > 0 else average
+        self.window_ms = self.window_draw_ms = 0.0
+        self.window_frames = self.window_draws = 0
+        
+        budget = 1000 / Settings.FPS
+        tier = self.tier
+        if average > budget * Settings.QUALITY_DOWNGRADE:
+            self.good_windows = 0
+            if tier == len(Settings.QUALITY_TIERS) - 1:
+                return None
+            tier += 1
+        elif projected < budget * Settings.QUALITY_UPGRADE and tier > 0:
+            self.good_windows += 1
+            if self.good_windows < Settings.QUALITY_UPGRADE_WINDOWS:
+                return None
+            self.good_windows = 0
+            tier -= 1
+        else:
+            self.good_windows = 0
+            return None
+            
+        logger.warning("quality %s -> %s: %.1f ms per frame against a %.1f ms budget",
+                       Settings.QUALITY_TIERS[self.tier]['name'], Settings.QUALITY_TIERS[tier]['name'],
+                       average, budget)
+        self.tier = tier
+        self.changes += 1
+        return tier
+        
+    def report(self):
+        """Return how often the tier changed this session and the time spent in each tier"""
+        total = sum(self.tier_ms) or 1.0
+        spent = "  ".join(f"{tier['name']} {ms / 1000:.1f}s ({ms / total:.0%})"
+                          for tier, ms in zip(Settings.QUALITY_TIERS, self.tier_ms))
+        return f"quality: {self.changes} tier changes; {spent}"
+        
+    def projected_cost(self, tier):
+        """Estimate the window's ms per frame had it drawn as often as a tier does"""
+        draw_per_frame = self.window_draw_ms / self.window_draws if self.window_draws else 0.0
+        other = (self.window_ms - self.window_draw_ms) / self.window_frames
+        return other + draw_per_frame / Settings.QUALITY_TIERS[tier]['draw_interval']
+
+
+# Held keys that affect the simulation, one bit each in a recorded tick
+RECORDED_KEYS = [
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+    pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_LSHIFT,
+]
+# KEYDOWN actions that affect the simulation, stored by index
+RECORDED_ACTIONS = [pygame.K_SPACE, pygame.K_r]
+
+
+class InputRecorder:
+    """Writes the RNG seed plus every tick's held keys and KEYDOWN actions to a binary file
+    
+    Layout: a HEADER, then per tick a TICK record (held-key bitmask, action count)
+    followed by one byte per action.
+    """
+    MAGIC = b'LSRP'
+    VERSION = 1
+    HEADER = struct.Struct('<4sBQH')  # magic, version, seed, tick rate
+    TICK = struct.Struct('<HB')
+    
+    def __init__(self, path, seed):
+        self.file = open(path, 'wb')
+        self.file.write(self.HEADER.pack(self.MAGIC, self.VERSION, seed, Settings.TICK_RATE))
+        self.actions = []
+        self.ticks = 0
+        
+    def action(self, key):
+        """Note a KEYDOWN action the game acted on; it is stored with the next tick"""
+        self.actions.append(RECORDED_ACTIONS.index(key))
+        
+    def tick(self, keys):
+        """Write one tick's held keys and the actions that preceded it"""
+        held = 0
+        for bit, key in enumerate(RECORDED_KEYS):
+            if keys[key]:
+                held |= 1 << bit
+        self.file.write(self.TICK.pack(held, len(self.actions)) + bytes(self.actions))
+        self.actions.clear()
+        self.ticks += 1
+        
+    def close(self):
+        """Flush and close the recording"""
+        self.file.close()
+
+
+class ReplayInput:
+    """Input source that plays a recording back one tick per frame"""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, self.seed, self.tick_rate = InputRecorder.HEADER.unpack_from(data)
+        if magic != InputRecorder.MAGIC or version != InputRecorder.VERSION:
+            raise ValueError(f"{path} is not a version {InputRecorder.VERSION} recording")
+            
+        # Decode every tick up front so playback does no parsing
+        self.ticks = []
+        offset = InputRecorder.HEADER.size
+        while offset < len(data):
+            held, count = InputRecorder.TICK.unpack_from(data, offset)
+            offset += InputRecorder.TICK.size
+            keys = KeyState(key for bit, key in enumerate(RECORDED_KEYS) if held & (1 << bit))
+            actions = [RECORDED_ACTIONS[idx] for idx in data[offset:offset + count]]
+            offset += count
+            self.ticks.append((keys, actions))
+        self.frame = 0
+        self.keys = KeyState()
+        
+    def finished(self):
+        """Return True once every recorded tick has been played"""
+        return self.frame >= len(self.ticks)
+        
+    def get_events(self):
+        """Return the recorded actions for the next tick, plus any window close request"""
+        events = [event for event in pygame.event.get() if event.type == pygame.QUIT]
+        if self.finished():
+            events.append(pygame.event.Event(pygame.QUIT))
+            return events
+        self.keys, actions = self.ticks[self.frame]
+        self.frame += 1
+        events.extend(pygame.event.Event(pygame.KEYDOWN, key=key) for key in actions)
+        return events
+        
+    def get_pressed(self):
+        """Return the keys held during the current recorded tick"""
+        return self.keys
 
 
 class Camera:
@@ -100,9 +895,23 @@ class Camera:
     def __init__(self):
         self.x = 0
         self.y = 0
+        self.prev_x = 0
+        self.prev_y = 0
+        # Cached world-space view rects, moved in place as the camera follows its target
+        self.viewport = pygame.Rect(0, 0, Settings.SCREEN_WIDTH, Settings.SCREEN_HEIGHT)
+        self.cull_rect = self.viewport.inflate(Settings.CULL_MARGIN * 2, Settings.CULL_MARGIN * 2)
+        self.lod_rect = self.viewport.inflate(Settings.LOD_MARGIN * 2, Settings.LOD_MARGIN * 2)
+        
+        # Interpolated position used for drawing, set by interpolate()
+        self.render_x = 0
+        self.render_y = 0
+        self.render_viewport = self.viewport.copy()
         
     def update(self, target_rect):
         """Update camera position to follow target"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Center the camera on the target
         self.x = target_rect.centerx - Settings.SCREEN_WIDTH // 2
         self.y = target_rect.centery - Settings.SCREEN_HEIGHT // 2
@@ -111,38 +920,271 @@ class Camera:
         self.x = max(0, min(self.x, Settings.WORLD_WIDTH - Settings.SCREEN_WIDTH))
         self.y = max(0, min(self.y, Settings.WORLD_HEIGHT - Settings.SCREEN_HEIGHT))
         
-    def world_to_screen(self, rect):
-        """Convert world coordinates to screen coordinates"""
-        return pygame.Rect(rect.x - self.x, rect.y - self.y, rect.width, rect.height)
+        self.viewport.topleft = (self.x, self.y)
+        self.cull_rect.center = self.viewport.center
+        self.lod_rect.center = self.viewport.center
+        
+    def interpolate(self, alpha):
+        """Place the render position alpha of the way from the previous to the current position"""
+        self.render_x = round(self.prev_x + (self.x - self.prev_x) * alpha)
+        self.render_y = round(self.prev_y + (self.y - self.prev_y) * alpha)
+        self.render_viewport.topleft = (self.render_x, self.render_y)
+        
+    def snap(self, target_rect):
+        """Jump straight to the target, with nothing to interpolate from"""
+        self.update(target_rect)
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.interpolate(1.0)
         
     def is_visible(self, rect):
         """Check if a rect is visible in the camera view"""
-        viewport = pygame.Rect(self.x, self.y, Settings.SCREEN_WIDTH, Settings.SCREEN_HEIGHT)
-        return viewport.colliderect(rect)
+        return self.viewport.colliderect(rect)
 
 
 class World:
-    """Class for the game world"""
+    """Class for the game world, rendered on demand as a small LRU cache of chunks
+    
+    Memory is bounded by WORLD_CHUNK_CACHE rather than by the world size.
+    """
     def __init__(self, asset_manager):
-        self.surface = pygame.Surface((Settings.WORLD_WIDTH, Settings.WORLD_HEIGHT))
         self.assets = asset_manager
-        self.create_world()
-        
-    def create_world(self):
-        """Create the large world surface with tiled background"""
-        bg_width = self.assets.background_image.get_width()
-        bg_height = self.assets.background_image.get_height()
-        
-        # Tile the background
-        for x in range(0, Settings.WORLD_WIDTH, bg_width):
-            for y in range(0, Settings.WORLD_HEIGHT, bg_height):
-                self.surface.blit(self.assets.background_image, (x, y))
+        self.chunk_size = Settings.WORLD_CHUNK_SIZE
+        self.chunks = collections.OrderedDict()  # (cx, cy) -> Surface, least recently used first
+        
+    def get_chunk(self, cx, cy):
+        """Return the rendered chunk at chunk coordinates, rendering it if needed"""
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.create_chunk(cx, cy)
+            self.chunks[key] = chunk
+            if len(self.chunks) > Settings.WORLD_CHUNK_CACHE:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+        
+    def create_chunk(self, cx, cy):
+        """Tile the background into one chunk surface"""
+        size = self.chunk_size
+        surface = pygame.Surface((size, size))
+        background = self.assets.background_image
+        bg_width = background.get_width()
+        bg_height = background.get_height()
+        
+        # Tiles are aligned to the world origin, so start at the tile containing the chunk corner
+        left = cx * size
+        top = cy * size
+        for x in range(left - left % bg_width, left + size, bg_width):
+            for y in range(top - top % bg_height, top + size, bg_height):
+                surface.blit(background, (x - left, y - top))
+        return surface
+        
+    def draw(self, screen, camera, area=None):
+        """Draw the world under the camera's render position, or only under a screen-space area of it"""
+        view = camera.render_viewport if area is None else area.move(camera.render_x, camera.render_y)
+        size = self.chunk_size
+        blits = []
+        for cy in range(view.top // size, (view.bottom - 1) // size + 1):
+            for cx in range(view.left // size, (view.right - 1) // size + 1):
+                source = view.clip(pygame.Rect(cx * size, cy * size, size, size))
+                blits.append((self.get_chunk(cx, cy),
+                              (source.x - camera.render_x, source.y - camera.render_y),
+                              source.move(-cx * size, -cy * size)))
+        screen.blits(blits, doreturn=False)
+
+
+class SpatialHash:
+    """Uniform grid that buckets items by world-space cell for broad-phase collision queries"""
+    def __init__(self, cell_size=Settings.SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        """Remove every item from the grid"""
+        self.cells.clear()
+
+    def cell_range(self, rect):
+        """Return the inclusive (x0, y0, x1, y1) cell bounds covered by a rect"""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def insert(self, item, rect):
+        """Add an item to every cell the rect overlaps"""
+        x0, y0, x1, y1 = self.cell_range(rect)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [item]
+                else:
+                    bucket.append(item)
+
+    def remove(self, item, rect):
+        """Remove an item that was inserted with the same rect"""
+        x0, y0, x1, y1 = self.cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is not None and item in bucket:
+                    bucket.remove(item)
+                    if not bucket:
+                        del self.cells[(cx, cy)]
+
+    def query(self, rect):
+        """Return the distinct items stored in the cells overlapped by rect"""
+        x0, y0, x1, y1 = self.cell_range(rect)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            return cells.get((x0, y0), ())
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    found.update(dict.fromkeys(bucket))
+        return found.keys()
+
+
+class ObjectPool:
+    """Free list that recycles instances of one entity class instead of reallocating them
+    
+    Pooled classes provide reset() taking the same arguments as their constructor.
+    """
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.allocated = 0
+        self.recycled = 0
+        
+    def acquire(self, *args):
+        """Return a recycled instance reset with args, or a new one if the pool is empty"""
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.recycled += 1
+        else:
+            obj = self.cls(*args)
+            self.allocated += 1
+        return obj
+        
+    def release(self, obj):
+        """Return an instance that is no longer in play to the pool"""
+        self.free.append(obj)
+        
+    def release_all(self, objs):
+        """Return every instance in a sequence to the pool"""
+        self.free.extend(objs)
+        
+    def take_counts(self):
+        """Return and clear the (allocated, recycled) counts since the last call"""
+        counts = (self.allocated, self.recycled)
+        self.allocated = 0
+        self.recycled = 0
+        return counts
+
+
+class EntityRegistry:
+    """Dense per-kind entity lists with generational handles, O(1) removal and deferred cleanup
+    
+    Each kind's entities live in one list that systems iterate directly and that is
+    never rebuilt. remove() only queues an entity; flush() applies the queue once per
+    tick, moving the last entity of a list into each hole. An entity's handle is a
+    (slot, generation) pair that goes stale once the entity is removed, so it stays
+    safe to hold even after a pool hands the same object out again.
+    """
+    def __init__(self, kinds):
+        self.entities = {kind: [] for kind in kinds}
+        self.remove_hooks = {kind: [] for kind in kinds}
+        self.generations = []
+        self.slot_entities = []
+        self.slot_kinds = []
+        self.free_slots = []
+        self.pending = {}  # slot -> entity queued for removal, in removal order
+        
+    def on_remove(self, kind, hook):
+        """Call hook(entity, index) as each entity of a kind is removed from list position index"""
+        self.remove_hooks[kind].append(hook)
+        
+    def add(self, kind, entity):
+        """Append an entity to its kind's list and give it a fresh handle"""
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.slot_entities[slot] = entity
+            self.slot_kinds[slot] = kind
+        else:
+            slot = len(self.generations)
+            self.generations.append(0)
+            self.slot_entities.append(entity)
+            self.slot_kinds.append(kind)
+        entities = self.entities[kind]
+        entity.handle = (slot, self.generations[slot])
+        entity.store_index = len(entities)
+        entities.append(entity)
+        return entity
+        
+    def get(self, handle):
+        """Return the entity a handle refers to, or None if it has been removed"""
+        slot, generation = handle
+        if self.generations[slot] != generation:
+            return None
+        return self.slot_entities[slot]
+        
+    def remove(self, entity):
+        """Queue an entity for removal at the next flush; queuing it twice is harmless"""
+        self.pending[entity.handle[0]] = entity
+        
+    def flush(self):
+        """Apply every queued removal"""
+        for slot, entity in self.pending.items():
+            kind = self.slot_kinds[slot]
+            entities = self.entities[kind]
+            index = entity.store_index
+            last = entities.pop()
+            if last is not entity:
+                entities[index] = last
+                last.store_index = index
+            for hook in self.remove_hooks[kind]:
+                hook(entity, index)
+            self.generations[slot] += 1
+            self.slot_entities[slot] = None
+            self.free_slots.append(slot)
+            entity.handle = None
+        self.pending.clear()
+        
+    def clear(self):
+        """Drop every entity without calling the remove hooks, invalidating all handles"""
+        for entities in self.entities.values():
+            for entity in entities:
+                entity.handle = None
+            entities.clear()
+        for slot in range(len(self.generations)):
+            self.generations[slot] += 1
+            self.slot_entities[slot] = None
+        self.free_slots = list(range(len(self.generations)))
+        self.pending.clear()
 
 
 class Entity:
     """Base class for game entities with common properties"""
+    __slots__ = ('rect', 'prev_x', 'prev_y', 'handle', 'store_index')
+    
     def __init__(self, x, y, width, height):
         self.rect = pygame.Rect(x, y, width, height)
+        # Registry handle and list position, set while the entity is in an EntityRegistry
+        self.handle = None
+        self.store_index = -1
+        # Position before the latest simulation tick, for interpolated drawing
+        self.prev_x = self.rect.x
+        self.prev_y = self.rect.y
+        
+    def save_position(self):
+        """Remember the current position as the start of this tick's movement"""
+        self.prev_x = self.rect.x
+        self.prev_y = self.rect.y
         
     def get_collision_rect(self):
         """Returns a smaller rectangle for collision detection"""
@@ -156,6 +1198,9 @@ class Entity:
 
 class Player(Entity):
     """Player class with player functionality"""
+    __slots__ = ('assets', 'speed', 'direction', 'frame', 'animation_speed', 'health', 'alive',
+                 'sprint_available', 'sprint_active', 'sprint_timer')
+    
     def __init__(self, x, y, assets):
         super().__init__(x, y, Settings.PLAYER_SIZE, Settings.PLAYER_SIZE)
         self.assets = assets
@@ -173,6 +1218,7 @@ class Player(Entity):
         
     def update(self, keys):
         """Update player position and animation based on input"""
+        self.save_position()
         if not self.alive:
             return False
             
@@ -276,7 +1322,6 @@ class Player(Entity):
     def die(self):
         """Handle player death"""
         self.alive = False
-        self.assets.player_death_sound.play()
         
     def get_spit_position(self):
         """Calculate the position to spawn a spit based on player direction"""
@@ -314,42 +1359,34 @@ class Player(Entity):
         
     def get_image(self):
         """Get the appropriate player image based on direction and animation frame"""
-        # For diagonal directions, use the primary direction's animation
-        base_direction = self.direction
-        if '-' in self.direction:
-            # Extract primary direction (first part of diagonal)
-            base_direction = self.direction.split('-')[0]
-        
-        row = {'up': 0, 'left': 1, 'down': 2, 'right': 3}[base_direction]
-        col = int(self.frame) % 4
-        return self.assets.player_sheet.subsurface(pygame.Rect(col * 80, row * 80, 80, 80))
+        # Diagonal directions map to their primary direction's frames in the cache
+        return self.assets.player_frames[self.direction][int(self.frame) % 4]
 
 
 class Spit(Entity):
     """Projectile class for player spits"""
+    __slots__ = ('direction', 'assets', 'speed', 'image', 'ttl')
+    
     def __init__(self, x, y, direction, assets):
         super().__init__(x, y, Settings.SPIT_SIZE, Settings.SPIT_SIZE)
+        self.speed = Settings.SPIT_SPEED
+        self.reset(x, y, direction, assets)
+        
+    def reset(self, x, y, direction, assets):
+        """(Re)initialise the spit for a new shot"""
+        self.rect.topleft = (x, y)
+        self.save_position()
         self.direction = direction
         self.assets = assets
-        self.speed = Settings.SPIT_SPEED
+        self.ttl = Settings.SPIT_RANGE // self.speed  # Ticks left before the spit is retired
         
-        # Add rotation angles for each direction including diagonals
-        self.rotation = {
-            'up': 180,
-            'up-right': 135,
-            'right': 90,
-            'down-right': 45,
-            'down': 0,
-            'down-left': 315,
-            'left': 270,
-            'up-left': 225
-        }[direction]
-        
-        # Rotate image once when created
-        self.image = pygame.transform.rotate(assets.spit_image, self.rotation)
+        # Pre-rotated image shared by every spit flying this way
+        self.image = assets.spit_images[direction]
         
     def update(self):
         """Update spit position based on direction"""
+        self.save_position()
+        self.ttl -= 1
         if 'right' in self.direction and 'up' not in self.direction and 'down' not in self.direction:
             self.rect.x += self.speed
         elif 'left' in self.direction and 'up' not in self.direction and 'down' not in self.direction:
@@ -373,22 +1410,27 @@ class Spit(Entity):
             self.rect.y += self.speed * 0.7071
             
     def is_off_screen(self):
-        """Check if spit is off the world boundaries"""
-        return (self.rect.right < 0 or self.rect.left > Settings.WORLD_WIDTH or
+        """Check if spit has used up its range or left the world"""
+        return (self.ttl <= 0 or self.rect.right < 0 or self.rect.left > Settings.WORLD_WIDTH or
                 self.rect.bottom < 0 or self.rect.top > Settings.WORLD_HEIGHT)
 
 
 class EnemySpit(Spit):
     """Enemy projectile class"""
-    def __init__(self, x, y, direction, assets):
-        super().__init__(x, y, direction, assets)
-        # Tint the spit red for enemy shots
-        self.image = self.image.copy()
-        self.image.fill((255, 0, 0), special_flags=pygame.BLEND_MULT)
+    __slots__ = ()
+    
+    def reset(self, x, y, direction, assets):
+        """(Re)initialise the spit for a new enemy shot"""
+        super().reset(x, y, direction, assets)
+        # Pre-rotated, red-tinted image for enemy shots
+        self.image = assets.enemy_spit_images[direction]
 
 
 class Enemy(Entity):
     """Enemy class with AI behavior"""
+    __slots__ = ('assets', 'speed', 'frame', 'animation_speed', 'target', 'direction',
+                 'shoot_delay', 'shoot_timer', 'velocity_x', 'velocity_y', 'pending_ticks')
+    
     def __init__(self, x, y, assets, target):
         super().__init__(x, y, Settings.PLAYER_SIZE, Settings.PLAYER_SIZE)
         self.assets = assets
@@ -399,10 +1441,15 @@ class Enemy(Entity):
         self.direction = 'down'
         self.shoot_delay = random.randint(Settings.ENEMY_SHOOT_DELAY_MIN, Settings.ENEMY_SHOOT_DELAY_MAX)
         self.shoot_timer = random.randint(0, self.shoot_delay)  # Random initial timer
-        
-    def can_shoot(self):
-        """Check if enemy can shoot based on timer"""
-        self.shoot_timer += 1
+        # Per-tick movement from the last think, and the ticks (the coming one included)
+        # the next think's shoot timer has to catch up on
+        self.velocity_x = 0
+        self.velocity_y = 0
+        self.pending_ticks = 1
+        
+    def can_shoot(self, ticks=1):
+        """Advance the shoot timer by some ticks and check if enemy can shoot"""
+        self.shoot_timer += ticks
         if self.shoot_timer >= self.shoot_delay:
             self.shoot_timer = 0
             return True
@@ -429,49 +1476,263 @@ class Enemy(Entity):
             
         return spit_x, spit_y
 
-    def update(self):
-        """Update enemy position and direction based on target"""
-        # Move towards player
+    def aim(self):
+        """Recompute the per-tick velocity and facing towards the target"""
         dx = self.target.rect.centerx - self.rect.centerx
         dy = self.target.rect.centery - self.rect.centery
         dist = max(abs(dx), abs(dy))
-        
-        if dist != 0:
-            dx = dx / dist * self.speed
-            dy = dy / dist * self.speed
+        if dist == 0:
+            self.velocity_x = self.velocity_y = 0
+            return
             
-            self.rect.x += dx
-            self.rect.y += dy
+        self.velocity_x = dx / dist * self.speed
+        self.velocity_y = dy / dist * self.speed
+        # Face along the dominant axis of movement
+        if abs(dx) > abs(dy):
+            self.direction = 'right' if dx > 0 else 'left'
+        else:
+            self.direction = 'down' if dy > 0 else 'up'
             
-            # Update direction based on movement
-            if abs(dx) > abs(dy):
-                self.direction = 'right' if dx > 0 else 'left'
-            else:
-                self.direction = 'down' if dy > 0 else 'up'
-        
-        # Update animation
-        self.frame = (self.frame + self.animation_speed) % 4
+    def think(self):
+        """Re-aim and catch the shoot timer up on the pending ticks, returning whether to shoot"""
+        self.aim()
+        ticks = self.pending_ticks
+        self.pending_ticks = 0
+        return self.can_shoot(ticks)
+        
+    def coast(self, animation_ticks=1):
+        """Dead-reckon one tick along the last computed velocity and advance the animation by some ticks"""
+        rect = self.rect
+        self.prev_x = rect.x
+        self.prev_y = rect.y
+        rect.x += self.velocity_x
+        rect.y += self.velocity_y
+        if animation_ticks:
+            self.frame = (self.frame + self.animation_speed * animation_ticks) % 4
+        self.pending_ticks += 1
+        
+    def update(self, steps=1):
+        """Update enemy position and direction based on target
+        
+        A coarse update (steps > 1) covers several ticks in one move and leaves the
+        animation alone; it is only used for enemies well outside the view.
+        """
+        self.aim()
+        if steps == 1:
+            self.coast()
+            return
+            
+        self.rect.x += self.velocity_x * steps
+        self.rect.y += self.velocity_y * steps
+        # Off-screen, so there is nothing to interpolate between
+        self.save_position()
 
     def get_image(self):
         """Get the appropriate enemy image based on direction and animation frame"""
-        row = {'up': 0, 'left': 1, 'down': 2, 'right': 3}[self.direction]
-        col = int(self.frame)
-        surface = self.assets.enemy_sheet.subsurface(pygame.Rect(col * 80, row * 80, 80, 80))
-        # Tint the enemy 
-        tinted_surface = surface.copy()
-        tinted_surface.fill((139, 69, 19), special_flags=pygame.BLEND_MULT)
-        return tinted_surface
+        # Frames are tinted once when the sprite cache is built
+        return self.assets.enemy_frames[self.direction][int(self.frame)]
 
 
+class AIScheduler:
+    """Spreads enemy think work over ticks in round-robin slices under a time budget
+    
+    Each tick thinks for enemies from where the previous tick stopped, Settings.AI_SLICE
+    at a time, until the budget is spent; the rest keep dead-reckoning along their last
+    velocity. At least one slice runs every tick, so every enemy is reached in turn.
+    """
+    def __init__(self, budget_us=Settings.AI_BUDGET_US):
+        self.budget_us = budget_us
+        self.cursor = 0
+        
+    def run(self, enemies):
+        """Think for a budgeted share of enemies, returning those ready to shoot and how many thought"""
+        count = len(enemies)
+        if count == 0:
+            return [], 0
+        deadline = None if self.budget_us is None else time.perf_counter() + self.budget_us / 1e6
+        cursor = self.cursor % count
+        shooters = []
+        thought = 0
+        while thought < count:
+            for _ in range(min(Settings.AI_SLICE, count - thought)):
+                enemy = enemies[cursor]
+                if enemy.think():
+                    shooters.append(enemy)
+                cursor += 1
+                if cursor == count:
+                    cursor = 0
+            thought += min(Settings.AI_SLICE, count - thought)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        self.cursor = cursor
+        return shooters, thought
+        
+        
+class EnemySwarm:
+    """Structure-of-arrays enemy engine that steers, animates and times shots with NumPy
+    
+    Row i mirrors the i-th Enemy in the game's enemy list. After each update the
+    Enemy objects are written back as lightweight views, so drawing and collision
+    code keep working on them unchanged.
+    """
+    DIRECTION_NAMES = sorted(Settings.SPRITE_SHEET_ROWS, key=Settings.SPRITE_SHEET_ROWS.get)
+    UP, LEFT, DOWN, RIGHT = (Settings.SPRITE_SHEET_ROWS[name] for name in ('up', 'left', 'down', 'right'))
+    COLUMNS = ('x', 'y', 'speed', 'frame', 'animation_speed', 'direction', 'shoot_timer', 'shoot_delay')
+    
+    def __init__(self):
+        self.load([])
+        # Enemies given a full and a coarse update by the last call to update()
+        self.full_count = 0
+        self.coarse_count = 0
+        
+    def load(self, enemies):
+        """Rebuild every array from a list of Enemy objects"""
+        rows = Settings.SPRITE_SHEET_ROWS
+        self.x = np.array([enemy.rect.x for enemy in enemies], dtype=np.int64)
+        self.y = np.array([enemy.rect.y for enemy in enemies], dtype=np.int64)
+        self.speed = np.array([enemy.speed for enemy in enemies], dtype=np.float64)
+        self.frame = np.array([enemy.frame for enemy in enemies], dtype=np.float64)
+        self.animation_speed = np.array([enemy.animation_speed for enemy in enemies], dtype=np.float64)
+        self.direction = np.array([rows[enemy.direction] for enemy in enemies], dtype=np.int64)
+        self.shoot_timer = np.array([enemy.shoot_timer for enemy in enemies], dtype=np.int64)
+        self.shoot_delay = np.array([enemy.shoot_delay for enemy in enemies], dtype=np.int64)
+        self.count = len(enemies)
+        
+    def add(self, enemy):
+        """Append a row for a newly spawned enemy"""
+        self.x = np.append(self.x, enemy.rect.x)
+        self.y = np.append(self.y, enemy.rect.y)
+        self.speed = np.append(self.speed, enemy.speed)
+        self.frame = np.append(self.frame, enemy.frame)
+        self.animation_speed = np.append(self.animation_speed, enemy.animation_speed)
+        self.direction = np.append(self.direction, Settings.SPRITE_SHEET_ROWS[enemy.direction])
+        self.shoot_timer = np.append(self.shoot_timer, enemy.shoot_timer)
+        self.shoot_delay = np.append(self.shoot_delay, enemy.shoot_delay)
+        self.count += 1
+        
+    def swap_remove(self, index):
+        """Drop a row by moving the last row into it, as EntityRegistry does with the enemy list
+        
+        The rows must be in step with the list, which holds between update() and the next spawn.
+        """
+        last = self.count - 1
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[index] = column[last]
+            setattr(self, name, column[:last])
+        self.count = last
+        
+    def sync(self, enemies):
+        """Pick up enemies appended to the list since the last update"""
+        if len(enemies) == self.count:
+            return
+        if len(enemies) > self.count:
+            for enemy in enemies[self.count:]:
+                self.add(enemy)
+        else:
+            self.load(enemies)
+            
+    @staticmethod
+    def round_rect_coord(values):
+        """Round like pygame.Rect does when assigned a float: halves away from zero"""
+        return np.copysign(np.floor(np.abs(values) + 0.5), values).astype(np.int64)
+        
+    def update(self, enemies, target_rect, viewport, lod_rect, tick, interval, animation_ticks):
+        """Advance every enemy one tick and return the indices that shoot this tick
+        
+        Matches the scalar path in Game.update_enemies: a full update for enemies inside
+        lod_rect, with the animation advanced by animation_ticks, and a coarse update
+        every interval ticks for the rest.
+        """
+        self.sync(enemies)
+        if self.count == 0:
+            self.full_count = self.coarse_count = 0
+            return []
+        size = Settings.PLAYER_SIZE
+        
+        # Level of detail: full updates near the view, staggered coarse updates elsewhere
+        full = ((self.x < lod_rect.right) & (self.x + size > lod_rect.left) &
+                (self.y < lod_rect.bottom) & (self.y + size > lod_rect.top))
+        coarse = ~full & ((np.arange(self.count) + tick) % interval == 0)
+        steps = np.where(full, 1, np.where(coarse, interval, 0))
+        
+        # Steer towards the target, normalised by the larger axis
+        dx = target_rect.centerx - (self.x + size // 2)
+        dy = target_rect.centery - (self.y + size // 2)
+        dist = np.maximum(np.abs(dx), np.abs(dy))
+        moving = (dist != 0) & (steps > 0)
+        safe_dist = np.where(moving, dist, 1)
+        step_x = dx / safe_dist * self.speed * steps
+        step_y = dy / safe_dist * self.speed * steps
+        self.x = np.where(moving, self.round_rect_coord(self.x + step_x), self.x)
+        self.y = np.where(moving, self.round_rect_coord(self.y + step_y), self.y)
+        
+        # Face along the dominant axis of movement
+        horizontal = np.abs(step_x) > np.abs(step_y)
+        facing = np.where(horizontal,
+                          np.where(step_x > 0, self.RIGHT, self.LEFT),
+                          np.where(step_y > 0, self.DOWN, self.UP))
+        self.direction = np.where(moving, facing, self.direction)
+        
+        # Animation only advances near the view; shoot timers catch up on coarse ticks
+        if animation_ticks:
+            self.frame = np.where(full, (self.frame + self.animation_speed * animation_ticks) % 4, self.frame)
+        self.shoot_timer += steps
+        ready = (steps > 0) & (self.shoot_timer >= self.shoot_delay)
+        self.shoot_timer[ready] = 0
+        
+        # Only enemies visible in the viewport may shoot
+        visible = ((self.x < viewport.right) & (self.x + size > viewport.left) &
+                   (self.y < viewport.bottom) & (self.y + size > viewport.top))
+        
+        # Write the new state back into the Enemy views that changed
+        names = self.DIRECTION_NAMES
+        full_rows = np.flatnonzero(full)
+        for idx, x, y, direction, frame in zip(full_rows.tolist(), self.x[full_rows].tolist(),
+                                               self.y[full_rows].tolist(),
+                                               self.direction[full_rows].tolist(),
+                                               self.frame[full_rows].tolist()):
+            enemy = enemies[idx]
+            rect = enemy.rect
+            enemy.prev_x = rect.x
+            enemy.prev_y = rect.y
+            rect.x = x
+            rect.y = y
+            enemy.direction = names[direction]
+            enemy.frame = frame
+        coarse_rows = np.flatnonzero(coarse)
+        for idx, x, y, direction in zip(coarse_rows.tolist(), self.x[coarse_rows].tolist(),
+                                        self.y[coarse_rows].tolist(),
+                                        self.direction[coarse_rows].tolist()):
+            # Off-screen, so there is nothing to interpolate between
+            enemy = enemies[idx]
+            enemy.rect.x = enemy.prev_x = x
+            enemy.rect.y = enemy.prev_y = y
+            enemy.direction = names[direction]
+            
+        self.full_count = len(full_rows)
+        self.coarse_count = len(coarse_rows)
+        return np.flatnonzero(ready & visible).tolist()
+        
+
 class FloatingItem(Entity):
     """Base class for floating items like coins and potions"""
+    __slots__ = ('image', 'collected', 'animation_timer', 'float_offset', 'float_direction', 'draw_offset')
+    
     def __init__(self, x, y, size, image):
         super().__init__(x, y, size, size)
         self.image = image
+        self.place(x, y)
+        
+    def place(self, x, y):
+        """Put the item at a position with a fresh float animation"""
+        self.rect.topleft = (x, y)
+        self.save_position()
         self.collected = False
         self.animation_timer = 0
         self.float_offset = 0
         self.float_direction = 1
+        self.draw_offset = 0
         
     def update(self):
         """Update floating animation"""
@@ -480,46 +1741,98 @@ class FloatingItem(Entity):
             self.float_offset += 0.2 * self.float_direction
             if abs(self.float_offset) >= 3:
                 self.float_direction *= -1
-    
-    def draw(self, screen, camera):
-        """Draw item with floating animation"""
-        draw_rect = self.rect.copy()
-        draw_rect.y += self.float_offset
-        screen.blit(self.image, camera.world_to_screen(draw_rect))
+            # Whole pixels, so the renderer can add it without building a rect
+            self.draw_offset = round(self.float_offset)
 
 
 class Coin(FloatingItem):
     """Coin item that player can collect for points"""
+    __slots__ = ('value',)
+    
     def __init__(self, x, y, assets):
         super().__init__(x, y, Settings.ITEM_SIZE, assets.coin_image)
         self.value = Settings.COIN_VALUE
+        
+    def reset(self, x, y, assets):
+        """Reuse a pooled coin at a new position"""
+        self.place(x, y)
+        self.value = Settings.COIN_VALUE
 
 
 class Potion(FloatingItem):
     """Potion item that heals the player"""
+    __slots__ = ('heal_amount',)
+    
     def __init__(self, x, y, assets):
         super().__init__(x, y, Settings.ITEM_SIZE, assets.potion_image)
         self.heal_amount = Settings.POTION_HEAL_AMOUNT
+        
+    def reset(self, x, y, assets):
+        """Reuse a pooled potion at a new position"""
+        self.place(x, y)
+        self.heal_amount = Settings.POTION_HEAL_AMOUNT
 
 
 class UI:
     """Class to handle all UI elements"""
+    OVERLAY_WIDTH = 560  # Perf overlay panel width; entity counts wrap to fit it
+    
     def __init__(self):
         self.score_font = pygame.font.Font(None, 36)
         self.game_over_font = pygame.font.Font(None, 74)
         self.restart_font = pygame.font.Font(None, 36)
+        self.overlay_font = pygame.font.Font(None, 22)
+        self.health_bars = {}
+        self.text_cache = collections.OrderedDict()  # (text, font, color) -> Surface
+        
+    def render_text(self, font, text, color):
+        """Return a rendering of text, reusing the cached surface unless the text is new"""
+        key = (text, font, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.text_cache[key] = surface
+            if len(self.text_cache) > Settings.TEXT_CACHE_SIZE:
+                self.text_cache.popitem(last=False)
+        else:
+            self.text_cache.move_to_end(key)
+        return surface
+        
+    def draw_loading_screen(self, screen, progress):
+        """Draw the startup loading screen with a progress bar"""
+        screen.fill((0, 0, 0))
+        text = self.render_text(self.score_font, "Loading...", (255, 255, 255))
+        center_x = Settings.SCREEN_WIDTH // 2
+        center_y = Settings.SCREEN_HEIGHT // 2
+        screen.blit(text, text.get_rect(center=(center_x, center_y - 30)))
+        bar = pygame.Rect(0, 0, 300, 16)
+        bar.center = (center_x, center_y + 10)
+        pygame.draw.rect(screen, (255, 255, 255), bar, 1)
+        pygame.draw.rect(screen, (255, 255, 255),
+                         (bar.x + 2, bar.y + 2, int((bar.width - 4) * progress), bar.height - 4))
         
     def draw_score(self, screen, score):
-        """Draw score in the top-right corner"""
-        score_text = self.score_font.render(f"Score: {score}", True, (255, 255, 255))
+        """Draw score in the top-right corner and return its screen rect"""
+        score_text = self.render_text(self.score_font, f"Score: {score}", (255, 255, 255))
         score_rect = score_text.get_rect(topright=(Settings.SCREEN_WIDTH - 10, 10))
-        screen.blit(score_text, score_rect)
+        return screen.blit(score_text, score_rect)
     
     def draw_difficulty(self, screen, difficulty_level):
-        """Draw difficulty level in the top-left corner"""
-        difficulty_text = self.score_font.render(f"Difficulty: {difficulty_level}", True, (255, 255, 255))
+        """Draw difficulty level in the top-left corner and return its screen rect"""
+        difficulty_text = self.render_text(self.score_font, f"Difficulty: {difficulty_level}", (255, 255, 255))
         difficulty_rect = difficulty_text.get_rect(topleft=(10, 10))
-        screen.blit(difficulty_text, difficulty_rect)
+        return screen.blit(difficulty_text, difficulty_rect)
+        
+    def get_health_bar(self, health, max_health):
+        """Return a cached health bar surface for a health value"""
+        key = (health, max_health)
+        surface = self.health_bars.get(key)
+        if surface is None:
+            surface = pygame.Surface((Settings.HEALTH_BAR_WIDTH, Settings.HEALTH_BAR_HEIGHT))
+            self.draw_health_bar(surface, 0, 0, Settings.HEALTH_BAR_WIDTH, Settings.HEALTH_BAR_HEIGHT,
+                                 health, max_health)
+            self.health_bars[key] = surface
+        return surface
         
     def draw_health_bar(self, screen, x, y, width, height, health, max_health):
         """Draw health bar with specified dimensions"""
@@ -536,34 +1849,195 @@ class UI:
         pygame.draw.rect(screen, (0, 0, 0), rectangle, 1)
         
     def draw_game_over(self, screen, can_restart):
-        """Draw game over screen"""
-        game_over_text = self.game_over_font.render("You Have Died!", True, (255, 0, 0))
+        """Draw game over screen and return the screen rects it covers"""
+        game_over_text = self.render_text(self.game_over_font, "You Have Died!", (255, 0, 0))
         text_rect = game_over_text.get_rect(center=(screen.get_width()/2, screen.get_height()/2))
-        screen.blit(game_over_text, text_rect)
+        rects = [screen.blit(game_over_text, text_rect)]
         
         if can_restart:
-            restart_text = self.restart_font.render("To play again hit the R key", True, (255, 255, 255))
+            restart_text = self.render_text(self.restart_font, "To play again hit the R key", (255, 255, 255))
             restart_rect = restart_text.get_rect(center=(screen.get_width()/2, screen.get_height()/2 + 50))
-            screen.blit(restart_text, restart_rect)
+            rects.append(screen.blit(restart_text, restart_rect))
+        return rects
+        
+    def draw_perf_overlay(self, screen, profiler):
+        """Draw rolling phase timings, p99 frame time and entity counts, returning the panel rect"""
+        averages = profiler.averages()
+        if not averages:
+            return None
+        counts = dict(profiler.latest_counts())
+        
+        def fmt(names):
+            return "  ".join(f"{name.split('.')[-1]} {averages.get(name, 0.0):.2f}" for name in names)
+        
+        total = averages['total']
+        lines = [
+            f"frame {total:.2f} ms avg  p99 {profiler.percentile(99):.2f} ms  "
+            f"({1000 / total if total else 0:.0f} fps)",
+            fmt(['events', 'update', 'audio', 'draw', 'tick']),
+            "collisions: " + fmt(['collisions.grid', 'collisions.enemy_spits',
+                                   'collisions.items', 'collisions.spits']),
+        ]
+        # Enemy level of detail gets its own line, so the tiers read side by side
+        if 'lod_full' in counts:
+            lines.append(f"enemy lod: full {counts.pop('lod_full')}  coarse {counts.pop('lod_coarse')}")
+        
+        # Counts wrap onto as many lines as they need to fit the panel
+        font = self.overlay_font
+        line = ""
+        for item in (f"{name} {value}" for name, value in counts.items()):
+            candidate = f"{line}  {item}" if line else item
+            if line and font.size(candidate)[0] > self.OVERLAY_WIDTH - 10:
+                lines.append(line)
+                candidate = item
+            line = candidate
+        if line:
+            lines.append(line)
+            
+        line_height = font.get_linesize()
+        width = max(self.OVERLAY_WIDTH, max(font.size(line)[0] for line in lines) + 10)
+        panel = pygame.Surface((width, line_height * len(lines) + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        for idx, line in enumerate(lines):
+            text = self.overlay_font.render(line, True, (255, 255, 0))
+            panel.blit(text, (5, 5 + idx * line_height))
+        return screen.blit(panel, (10, 50))
+
+
+class DirtyRectRenderer:
+    """Redraws only the screen areas that changed since the previous frame
+    
+    While the camera is still, the background is restored and sprites are redrawn
+    only under sprites that moved, appeared or vanished and under the UI, and just
+    those rects are pushed with pygame.display.update. Camera movement falls back
+    to a full redraw.
+    """
+    def __init__(self):
+        self.camera_pos = None
+        self.prev_sprites = set()
+        self.prev_ui_rects = []
+        self.screen_rect = pygame.Rect(0, 0, Settings.SCREEN_WIDTH, Settings.SCREEN_HEIGHT)
+        
+    def invalidate(self):
+        """Force the next frame to be a full redraw"""
+        self.camera_pos = None
+        
+    def render(self, game, count):
+        """Draw one frame of the first count queued sprites, returning the number of dirty rects"""
+        sprites = game.render_queue[:count]
+        keys = {(image, x, y) for image, (x, y) in sprites}
+        camera_pos = (game.camera.render_x, game.camera.render_y)
+        if camera_pos != self.camera_pos:
+            self.prev_ui_rects = game.draw_full(count)
+            self.prev_sprites = keys
+            self.camera_pos = camera_pos
+            return 0
+            
+        # Areas vacated by moved or removed sprites, covered by new ones, and under last frame's UI
+        rects = [image.get_rect(topleft=pos) for image, pos in sprites]
+        dirty = [image.get_rect(topleft=(x, y)) for image, x, y in self.prev_sprites - keys]
+        dirty.extend(rect for (image, (x, y)), rect in zip(sprites, rects)
+                     if (image, x, y) not in self.prev_sprites)
+        dirty.extend(self.prev_ui_rects)
+        
+        # A sprite touching a dirty area is redrawn whole, which dirties the rest of its rect too
+        redraw = [False] * len(sprites)
+        changed = True
+        while changed:
+            changed = False
+            for idx, rect in enumerate(rects):
+                if not redraw[idx] and rect.collidelist(dirty) != -1:
+                    redraw[idx] = True
+                    dirty.append(rect)
+                    changed = True
+                    
+        screen = game.screen
+        dirty = [rect.clip(self.screen_rect) for rect in dirty]
+        for rect in dirty:
+            if rect.width and rect.height:
+                game.world.draw(screen, game.camera, rect)
+        screen.blits([sprite for sprite, needs_redraw in zip(sprites, redraw) if needs_redraw],
+                     doreturn=False)
+                
+        ui_rects = game.draw_ui()
+        pygame.display.update(dirty + ui_rects)
+        self.prev_sprites = keys
+        self.prev_ui_rects = ui_rects
+        return len(dirty) + len(ui_rects)
 
 
 class SoundManager:
-    """Class to handle sound playback and management"""
+    """Queues sound effects each frame and plays them on a fixed set of prioritised voices
+    
+    Game code may queue() a category any number of times per frame. update() runs once
+    per frame and plays at most the category's per-frame limit, no sooner than its
+    minimum interval, so audio cost stays flat however many events land at once. A
+    sound takes a free voice, or else steals the oldest voice playing a sound of no
+    higher priority.
+    """
     def __init__(self, assets):
         self.assets = assets
-        # Configure mixer
+        # Configure mixer; reserved channels are left alone by Sound.play()
         pygame.mixer.set_num_channels(16)
-        self.available_channels = [pygame.mixer.Channel(i) for i in range(8, 16)]
+        pygame.mixer.set_reserved(Settings.SOUND_VOICES)
+        self.voices = [pygame.mixer.Channel(i) for i in range(Settings.SOUND_VOICES)]
+        self.voice_priority = [0] * len(self.voices)
+        self.voice_started = [0.0] * len(self.voices)
+        self.voice_limit = len(self.voices)
+        
+        self.sounds = {
+            'player_death': [assets.player_death_sound],
+            'death': assets.death_sounds,
+            'spit': assets.spit_sounds,
+        }
+        categories = Settings.SOUND_CATEGORIES
+        self.play_order = sorted(categories, key=lambda category: categories[category][0], reverse=True)
+        self.pending = dict.fromkeys(categories, 0)
+        self.last_played = dict.fromkeys(categories, float('-inf'))
+        
+    def queue(self, category):
+        """Request a sound from a category for this frame"""
+        self.pending[category] += 1
         
-    def play_random_death_sound(self):
-        """Play a random death sound on an available channel"""
-        sound = self.assets.get_random_death_sound()
-        # Find first available channel
-        for channel in self.available_channels:
+    def update(self):
+        """Play this frame's queued sounds, highest priority first, returning how many played"""
+        now = time.perf_counter()
+        played = 0
+        for category in self.play_order:
+            requested = self.pending[category]
+            if not requested:
+                continue
+            self.pending[category] = 0
+            priority, per_frame, min_interval = Settings.SOUND_CATEGORIES[category]
+            if (now - self.last_played[category]) * 1000 < min_interval:
+                continue
+            for _ in range(min(requested, per_frame)):
+                voice = self.allocate_voice(priority)
+                if voice is None:
+                    break
+                # Variant choice is cosmetic, so it uses the assets' own RNG
+                self.voices[voice].play(self.assets.rng.choice(self.sounds[category]))
+                self.voice_priority[voice] = priority
+                self.voice_started[voice] = now
+                self.last_played[category] = now
+                played += 1
+        return played
+        
+    def set_voice_limit(self, count):
+        """Use only the first count voices for new sounds; any beyond finish what they are playing"""
+        self.voice_limit = max(1, min(count, len(self.voices)))
+        
+    def allocate_voice(self, priority):
+        """Return a free voice, else the oldest one playing at or below priority, else None"""
+        steal = None
+        for idx, channel in enumerate(self.voices[:self.voice_limit]):
             if not channel.get_busy():
-                channel.play(sound)
-                break
-                
+                return idx
+            if self.voice_priority[idx] <= priority and (
+                    steal is None or self.voice_started[idx] < self.voice_started[steal]):
+                steal = idx
+        return steal
+        
     def play_background_music(self):
         """Start playing background music"""
         pygame.mixer.music.load(self.assets.bg_music)
@@ -573,23 +2047,47 @@ class SoundManager:
 
 class Game:
     """Main game class that manages the game state and components"""
-    def __init__(self):
-        pygame.init()
+    def __init__(self, headless=False, input_source=None, seed=None, record_path=None, telemetry_path=None):
+        self.headless = headless
+        
+        # Seed the simulation RNG so a session can be recorded and replayed exactly
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        random.seed(self.seed)
+        if headless:
+            # SDL's dummy drivers need neither a window nor a sound card
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        self.input = input_source or (ScriptedInput() if headless else LiveInput())
+        self.replaying = isinstance(self.input, ReplayInput)
+        self.recorder = InputRecorder(record_path, self.seed) if record_path else None
+        self.telemetry = TelemetryWriter(telemetry_path) if telemetry_path else None
+        self.startup_timer = StageTimer('startup')
+        
+        # Only the modules the game uses; the mixer waits until the loading screen is up
+        pygame.display.init()
         pygame.font.init()
-        pygame.mixer.init()
+        self.startup_timer.mark('pygame init')
         
         self.screen = pygame.display.set_mode((Settings.SCREEN_WIDTH, Settings.SCREEN_HEIGHT))
         pygame.display.set_caption("Llama Spitter")
         self.clock = pygame.time.Clock()
         self.running = True
+        self.profiler = FrameProfiler()
+        self.show_perf_overlay = False
+        self.dirty_renderer = DirtyRectRenderer() if Settings.DIRTY_RECT_RENDERING else None
+        self.ui = UI()
+        self.startup_timer.mark('display')
         
-        # Initialize components
+        # Assets decode on a worker thread behind a loading screen; images are converted
+        # for the display once they arrive
         self.assets = AssetManager()
-        self.assets.load_assets()
+        self.load_assets()
         
         self.sound_manager = SoundManager(self.assets)
         self.camera = Camera()
-        self.ui = UI()
+        self.governor = QualityGovernor() if Settings.QUALITY_GOVERNOR else None
+        self.set_quality(0)
+        self.startup_timer.mark('components')
         
         # Game state
         self.game_over = False
@@ -598,16 +2096,54 @@ class Game:
         self.score = 0
         self.enemies_killed = 0
         
-        # Game objects
+        # Free lists so projectiles and drops are recycled rather than reallocated
+        self.spit_pool = ObjectPool(Spit)
+        self.enemy_spit_pool = ObjectPool(EnemySpit)
+        self.coin_pool = ObjectPool(Coin)
+        self.potion_pool = ObjectPool(Potion)
+        
+        # Spatial indexes for broad-phase collision checks
+        self.enemy_grid = SpatialHash()
+        self.enemy_spit_grid = SpatialHash()
+        self.item_grid = SpatialHash()
+        self.enemy_collision_rects = []
+        
+        # NumPy enemy engine, or None to update each Enemy object in Python
+        self.enemy_swarm = EnemySwarm() if np is not None and Settings.VECTORIZED_ENEMIES else None
+        # A wall-clock budget would make recordings diverge on replay, so those think for everyone
+        self.ai_scheduler = AIScheduler(None if self.replaying or self.recorder is not None
+                                        else Settings.AI_BUDGET_US)
+        
+        # Game objects; the entity lists belong to the registry and are never replaced
         self.world = None
         self.player = None
-        self.spits = []
-        self.enemies = []
-        self.enemy_spits = []
-        self.coins = []
-        self.potions = []
+        self.registry = EntityRegistry(['spits', 'enemies', 'enemy_spits', 'coins', 'potions'])
+        self.spits = self.registry.entities['spits']
+        self.enemies = self.registry.entities['enemies']
+        self.enemy_spits = self.registry.entities['enemy_spits']
+        self.coins = self.registry.entities['coins']
+        self.potions = self.registry.entities['potions']
+        self.registry.on_remove('spits', lambda spit, index: self.spit_pool.release(spit))
+        self.registry.on_remove('enemy_spits', lambda spit, index: self.enemy_spit_pool.release(spit))
+        self.registry.on_remove('coins', lambda coin, index: self.coin_pool.release(coin))
+        self.registry.on_remove('potions', lambda potion, index: self.potion_pool.release(potion))
+        if self.enemy_swarm is not None:
+            self.registry.on_remove('enemies', lambda enemy, index: self.enemy_swarm.swap_remove(index))
+            
+        # Render queue of (image, screen position) pairs, filled by collect_sprites from
+        # (entity list, image getter, floats) layers in draw order
+        self.render_queue = []
+        image = operator.attrgetter('image')
+        self.sprite_layers = (
+            (self.spits, image, False),
+            (self.enemies, Enemy.get_image, False),
+            (self.enemy_spits, image, False),
+            (self.coins, image, True),
+            (self.potions, image, True),
+        )
         
         # Timers
+        self.tick = 0  # Simulated ticks this game; staggers off-screen enemy updates
         self.spawn_timer = 0
         self.spawn_delay = Settings.ENEMY_SPAWN_DELAY
         
@@ -615,12 +2151,53 @@ class Game:
         self.difficulty_timer = 0
         self.difficulty_level = 1  # Starting at level 1
         
-        self.init_game()
+        self.init_game(self.startup_timer)
         
-    def init_game(self):
+    def load_assets(self):
+        """Open the mixer and decode assets on a worker thread, keeping a loading screen drawn meanwhile"""
+        self.ui.draw_loading_screen(self.screen, 0.0)
+        pygame.display.flip()
+        self.startup_timer.mark('loading screen')
+        
+        pygame.mixer.init()
+        self.startup_timer.mark('mixer init')
+        
+        with concurrent.futures.ThreadPoolExecutor(1) as loader:
+            decoding = loader.submit(self.assets.decode_assets)
+            while not concurrent.futures.wait([decoding], timeout=1 / Settings.LOADING_SCREEN_FPS).done:
+                # Keep the window responsive; a quit ends the game as soon as it is built
+                if pygame.event.get(pygame.QUIT):
+                    self.running = False
+                self.ui.draw_loading_screen(self.screen, self.assets.load_progress())
+                pygame.display.flip()
+        decoding.result()
+        self.startup_timer.mark('decode assets')
+        
+        self.assets.prepare_images()
+        self.startup_timer.mark('prepare images')
+        
+        # The loading screen is still showing, so the first game frame must be drawn in full
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.invalidate()
+        
+    def set_quality(self, tier):
+        """Apply a tier from Settings.QUALITY_TIERS"""
+        self.quality_tier = tier
+        self.quality = Settings.QUALITY_TIERS[tier]
+        self.sound_manager.set_voice_limit(self.quality['sound_voices'])
+        # Off-screen fidelity changes the simulation, so recordings and replays keep full fidelity
+        deterministic = self.replaying or self.recorder is not None
+        self.offscreen_interval = Settings.LOD_OFFSCREEN_INTERVAL * (
+            1 if deterministic else self.quality['offscreen_scale'])
+        
+    def init_game(self, timer=None):
         """Initialize or reset the game state"""
-        # Create world
-        self.world = World(self.assets)
+        timer = timer or StageTimer('reset')
+        
+        # The world never changes, so it (and its chunk cache) is reused across resets
+        if self.world is None:
+            self.world = World(self.assets)
+        timer.mark('world')
         
         # Create player at center of world
         self.player = Player(
@@ -628,13 +2205,18 @@ class Game:
             Settings.WORLD_HEIGHT // 2,
             self.assets
         )
-        
-        # Clear all game objects
-        self.spits = []
-        self.enemies = []
-        self.enemy_spits = []
-        self.coins = []
-        self.potions = []
+        # Frames drawn before the first tick, and the first frame after a reset, start on the player
+        self.camera.snap(self.player.rect)
+        
+        # Clear all game objects, returning pooled ones to their pools
+        self.spit_pool.release_all(self.spits)
+        self.enemy_spit_pool.release_all(self.enemy_spits)
+        self.coin_pool.release_all(self.coins)
+        self.potion_pool.release_all(self.potions)
+        self.registry.clear()
+        self.item_grid.clear()
+        if self.enemy_swarm is not None:
+            self.enemy_swarm.load(self.enemies)
         
         # Reset game state
         self.score = 0
@@ -646,14 +2228,24 @@ class Game:
         # Reset difficulty
         self.difficulty_timer = 0
         self.difficulty_level = 1
+        self.tick = 0
+        self.ai_scheduler.cursor = 0
+        self.spawn_timer = 0
         self.spawn_delay = Settings.ENEMY_SPAWN_DELAY
+        timer.mark('game state')
         
         # Start background music
-        self.sound_manager.play_background_music()
+        if not self.headless:
+            self.sound_manager.play_background_music()
+        timer.mark('music')
+        return timer
         
     def reset_game(self):
         """Reset the game after player death"""
-        self.init_game()
+        logger.info(self.init_game().report())
+        # Every entity was replaced, so nothing on screen can be trusted for a partial redraw
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.invalidate()
         
     def spawn_enemy(self):
         """Spawn a new enemy at the edge of the world"""
@@ -673,24 +2265,39 @@ class Game:
             x = -80
             y = random.randint(0, Settings.WORLD_HEIGHT)
             
-        self.enemies.append(Enemy(x, y, self.assets, self.player))
+        self.registry.add('enemies', Enemy(x, y, self.assets, self.player))
         
     def handle_events(self):
         """Process all game events"""
-        for event in pygame.event.get():
+        for event in self.input.get_events():
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and self.game_over and self.trombone_played:
+                if event.key == pygame.K_F3:
+                    self.show_perf_overlay = not self.show_perf_overlay
+                # A replay restarts without waiting for the (real-time) death sounds
+                elif (event.key == pygame.K_r and self.game_over and
+                      (self.trombone_played or self.replaying)):
+                    self.record_action(event.key)
                     self.reset_game()
                 elif not self.game_over and event.key == pygame.K_SPACE:
+                    self.record_action(event.key)
                     # Create new spit
                     spit_x, spit_y = self.player.get_spit_position()
-                    self.spits.append(Spit(spit_x, spit_y, self.player.direction, self.assets))
-                    self.assets.get_random_spit_sound().play()
+                    self.registry.add('spits', self.spit_pool.acquire(spit_x, spit_y, self.player.direction,
+                                                                      self.assets))
+                    self.sound_manager.queue('spit')
+                    
+    def record_action(self, key):
+        """Pass a simulation-affecting KEYDOWN to the recorder, if recording"""
+        if self.recorder is not None:
+            self.recorder.action(key)
                     
     def update(self):
         """Update game state"""
+        if self.recorder is not None:
+            self.recorder.tick(self.input.get_pressed())
+            
         if not self.game_over:
             # Update difficulty timer
             self.difficulty_timer += 1
@@ -710,36 +2317,57 @@ class Game:
                 self.spawn_enemy()
                 
             # Update player
-            keys = pygame.key.get_pressed()
+            keys = self.input.get_pressed()
             self.player.update(keys)
                 
             # Update spits
-            self.spits = [spit for spit in self.spits if not spit.is_off_screen()]
-            for spit in self.spits:
-                spit.update()
-
-            # Update enemies
-            for enemy in self.enemies:
-                enemy.update()
-                # Only allow enemies that are visible in the viewport to shoot
-                if enemy.can_shoot() and self.camera.is_visible(enemy.rect):
-                    spit_x, spit_y = enemy.get_spit_position()
-                    self.enemy_spits.append(EnemySpit(spit_x, spit_y, enemy.direction, self.assets))
+            self.update_spits(self.spits)
+
+            # Update enemies, animating them every animation_interval ticks at lower quality
+            self.tick += 1
+            animation_interval = self.quality['animation_interval']
+            animation_ticks = animation_interval if self.tick % animation_interval == 0 else 0
+            if self.enemy_swarm is not None:
+                swarm = self.enemy_swarm
+                for enemy_idx in swarm.update(self.enemies, self.player.rect, self.camera.viewport,
+                                              self.camera.lod_rect, self.tick, self.offscreen_interval,
+                                              animation_ticks):
+                    self.enemy_shoot(self.enemies[enemy_idx])
+                lod_full, lod_coarse = swarm.full_count, swarm.coarse_count
+                ai_thinks = lod_full
+            else:
+                lod_full, lod_coarse, ai_thinks = self.update_enemies(animation_ticks)
 
             # Update enemy spits
-            self.enemy_spits = [spit for spit in self.enemy_spits if not spit.is_off_screen()]
-            for spit in self.enemy_spits:
-                spit.update()
-                
-            # Update items
-            for coin in self.coins:
-                coin.update()
+            self.update_spits(self.enemy_spits)
                 
-            for potion in self.potions:
-                potion.update()
+            # Update items; their float is cosmetic and stops at lower quality
+            if self.quality['item_float']:
+                for coin in self.coins:
+                    coin.update()
+                    
+                for potion in self.potions:
+                    potion.update()
                 
             # Check collisions
+            start = time.perf_counter()
             self.check_collisions()
+            self.profiler.add('collisions', start)
+            
+            # Apply this tick's removals in one pass
+            self.registry.flush()
+            
+            self.profiler.set_counts(
+                spits=len(self.spits),
+                enemies=len(self.enemies),
+                enemy_spits=len(self.enemy_spits),
+                coins=len(self.coins),
+                potions=len(self.potions),
+                difficulty=self.difficulty_level,
+                lod_full=lod_full,
+                lod_coarse=lod_coarse,
+                ai_thinks=ai_thinks,
+            )
         else:
             # Handle death sounds
             self.handle_death_sounds()
@@ -747,20 +2375,105 @@ class Game:
         # Update camera to follow player
         self.camera.update(self.player.rect)
         
+    def update_enemies(self, animation_ticks=1):
+        """Update each Enemy object at its level of detail, returning (full, coarse, thought) counts
+        
+        Enemies near the view dead-reckon every tick, while the AI scheduler re-aims a
+        budgeted share of them and decides their shots.
+        """
+        lod_rect = self.camera.lod_rect
+        interval = self.offscreen_interval
+        near = []
+        coarse = 0
+        for enemy_idx, enemy in enumerate(self.enemies):
+            if lod_rect.colliderect(enemy.rect):
+                near.append(enemy)
+            elif (enemy_idx + self.tick) % interval == 0:
+                # Far from the view: one coarse step stands in for the skipped ticks
+                enemy.update(interval)
+                enemy.pending_ticks = 1
+                coarse += 1
+                if enemy.can_shoot(interval) and self.camera.is_visible(enemy.rect):
+                    self.enemy_shoot(enemy)
+                    
+        shooters, thought = self.ai_scheduler.run(near)
+        for enemy in near:
+            enemy.coast(animation_ticks)
+        # Only allow enemies that are visible in the viewport to shoot
+        for enemy in shooters:
+            if self.camera.is_visible(enemy.rect):
+                self.enemy_shoot(enemy)
+        return len(near), coarse, thought
+        
+    def enemy_shoot(self, enemy):
+        """Fire a spit from an enemy in the direction it faces"""
+        spit_x, spit_y = enemy.get_spit_position()
+        self.registry.add('enemy_spits', self.enemy_spit_pool.acquire(spit_x, spit_y, enemy.direction,
+                                                                      self.assets))
+        
+    def update_spits(self, spits):
+        """Move spits, queueing those that have run out of range or left the world for removal"""
+        remove = self.registry.remove
+        for spit in spits:
+            spit.update()
+            if spit.is_off_screen():
+                remove(spit)
+        
+    def record_allocations(self):
+        """Record how many pooled objects were newly allocated versus recycled this frame"""
+        allocated = 0
+        recycled = 0
+        for pool in (self.spit_pool, self.enemy_spit_pool, self.coin_pool, self.potion_pool):
+            pool_allocated, pool_recycled = pool.take_counts()
+            allocated += pool_allocated
+            recycled += pool_recycled
+        self.profiler.set_counts(allocated=allocated, recycled=recycled)
+        
     def check_collisions(self):
         """Check all collisions between game objects"""
+        profiler = self.profiler
+        start = time.perf_counter()
+        self.rebuild_spatial_grids()
+        profiler.add('collisions.grid', start)
+        
+        start = time.perf_counter()
         self.check_player_enemy_spit_collision()
+        profiler.add('collisions.enemy_spits', start)
+        
+        start = time.perf_counter()
         self.check_player_item_collision()
+        profiler.add('collisions.items', start)
+        
+        start = time.perf_counter()
         self.check_spit_enemy_collision()
+        profiler.add('collisions.spits', start)
+        
+    def rebuild_spatial_grids(self):
+        """Re-bucket moving entities into their spatial grids for this tick"""
+        self.enemy_collision_rects = [enemy.get_collision_rect() for enemy in self.enemies]
+        self.enemy_grid.clear()
+        for enemy_idx, enemy_rect in enumerate(self.enemy_collision_rects):
+            self.enemy_grid.insert(enemy_idx, enemy_rect)
+            
+        self.enemy_spit_grid.clear()
+        for spit in self.enemy_spits:
+            self.enemy_spit_grid.insert(spit, spit.rect)
+            
+    def add_item(self, item):
+        """Add a dropped coin or potion to the world"""
+        self.registry.add('potions' if isinstance(item, Potion) else 'coins', item)
+        self.item_grid.insert(item, item.rect)
         
     def check_player_enemy_spit_collision(self):
         """Check if player is hit by enemy spits"""
         player_collision_rect = self.player.get_collision_rect()
         
-        for spit in self.enemy_spits[:]:
+        for spit in self.enemy_spit_grid.query(player_collision_rect):
             if spit.rect.colliderect(player_collision_rect):
-                self.player.take_damage(10)
-                self.enemy_spits.remove(spit)
+                was_alive = self.player.alive
+                if not self.player.take_damage(10) and was_alive:
+                    self.sound_manager.queue('player_death')
+                self.registry.remove(spit)
                 
         if self.player.health <= 0 and self.player.alive:
             self.player.alive = False
@@ -771,46 +2484,39 @@ class Game:
         """Check if player collects coins or potions"""
         player_collision_rect = self.player.get_collision_rect()
         
-        # Check coin collisions
-        for coin in self.coins[:]:
-            if player_collision_rect.colliderect(coin.rect) and not coin.collected:
-                coin.collected = True
-                self.score += coin.value
-                self.coins.remove(coin)
-        
-        # Check potion collisions
-        for potion in self.potions[:]:
-            if player_collision_rect.colliderect(potion.rect) and not potion.collected:
-                potion.collected = True
-                self.player.heal(potion.heal_amount)
-                self.potions.remove(potion)
+        # Copy the query result, since collected items leave the grid as we go
+        for item in list(self.item_grid.query(player_collision_rect)):
+            if not player_collision_rect.colliderect(item.rect) or item.collected:
+                continue
+            item.collected = True
+            self.item_grid.remove(item, item.rect)
+            self.registry.remove(item)
+            if isinstance(item, Potion):
+                self.player.heal(item.heal_amount)
+            else:
+                self.score += item.value
                 
     def check_spit_enemy_collision(self):
         """Check if player spits hit enemies"""
-        spits_to_remove = set()
-        enemies_to_remove = set()
-        
-        for spit_idx, spit in enumerate(self.spits):
-            for enemy_idx, enemy in enumerate(self.enemies):
-                enemy_collision_rect = enemy.get_collision_rect()
-                if spit.rect.colliderect(enemy_collision_rect):
-                    spits_to_remove.add(spit_idx)
-                    enemies_to_remove.add(enemy_idx)
+        remove = self.registry.remove
+        for spit in self.spits:
+            # Only test enemies bucketed in the cells this spit overlaps
+            for enemy_idx in sorted(self.enemy_grid.query(spit.rect)):
+                enemy = self.enemies[enemy_idx]
+                if spit.rect.colliderect(self.enemy_collision_rects[enemy_idx]):
+                    remove(spit)
+                    remove(enemy)
                     self.score += Settings.ENEMY_KILL_SCORE
                     self.enemies_killed += 1
-                    self.sound_manager.play_random_death_sound()
+                    self.sound_manager.queue('death')
                     
                     # Drop a coin or potion
                     if self.enemies_killed % Settings.ENEMIES_FOR_POTION == 0:
                         # Every 20th kill drops a potion
-                        self.potions.append(Potion(enemy.rect.centerx, enemy.rect.centery, self.assets))
+                        self.add_item(self.potion_pool.acquire(enemy.rect.centerx, enemy.rect.centery, self.assets))
                     else:
                         # All other kills drop a coin
-                        self.coins.append(Coin(enemy.rect.centerx, enemy.rect.centery, self.assets))
-        
-        # Remove collided objects
-        self.spits = [spit for idx, spit in enumerate(self.spits) if idx not in spits_to_remove]
-        self.enemies = [enemy for idx, enemy in enumerate(self.enemies) if idx not in enemies_to_remove]
+                        self.add_item(self.coin_pool.acquire(enemy.rect.centerx, enemy.rect.centery, self.assets))
         
     def handle_death_sounds(self):
         """Handle the sequence of sounds played on death"""
@@ -823,72 +2529,270 @@ class Game:
             if not pygame.mixer.get_busy():  # If trombone finished playing
                 self.trombone_played = True
                 
-    def draw(self):
-        """Draw all game elements"""
+    def collect_sprites(self, alpha=1.0):
+        """Fill the render queue with (image, screen position) pairs for every visible entity, in draw order
+        
+        Entities are placed alpha of the way from their previous to their current position.
+        The queue list is reused from frame to frame and only grows, so entries past the
+        returned count are leftovers from a busier frame.
+        """
+        camera = self.camera
+        cam_x = camera.render_x
+        cam_y = camera.render_y
+        queue = self.render_queue
+        capacity = len(queue)
+        count = 0
+        
+        # Player and the health bar above it
+        player = self.player
+        if player.alive:
+            x = round(player.prev_x + (player.rect.x - player.prev_x) * alpha) - cam_x
+            y = round(player.prev_y + (player.rect.y - player.prev_y) * alpha) - cam_y
+            health_bar = self.ui.get_health_bar(player.health, Settings.PLAYER_MAX_HEALTH)
+            for entry in ((player.get_image(), (x, y)),
+                          (health_bar, (x + player.rect.width // 2 - Settings.HEALTH_BAR_WIDTH // 2, y - 15))):
+                if count < capacity:
+                    queue[count] = entry
+                else:
+                    queue.append(entry)
+                    capacity += 1
+                count += 1
+                
+        # Only entities overlapping the (slightly padded) view are drawn
+        cull = camera.cull_rect.colliderect
+        visible = count
+        interpolate = alpha != 1.0
+        for entities, image_of, floats in self.sprite_layers:
+            for entity in entities:
+                rect = entity.rect
+                if not cull(rect):
+                    continue
+                x = rect.x
+                y = rect.y
+                if interpolate:
+                    x = round(entity.prev_x + (x - entity.prev_x) * alpha)
+                    y = round(entity.prev_y + (y - entity.prev_y) * alpha)
+                if floats:
+                    y += entity.draw_offset
+                entry = (image_of(entity), (x - cam_x, y - cam_y))
+                if count < capacity:
+                    queue[count] = entry
+                else:
+                    queue.append(entry)
+                    capacity += 1
+                count += 1
+                
+        drawn = count - visible
+        total = (len(self.spits) + len(self.enemies) + len(self.enemy_spits) +
+                 len(self.coins) + len(self.potions))
+        self.profiler.set_counts(drawn=drawn, culled=total - drawn)
+        return count
+        
+    def draw_ui(self):
+        """Draw the HUD and any overlays, returning the screen rects they cover"""
+        rects = [
+            self.ui.draw_score(self.screen, self.score),
+            self.ui.draw_difficulty(self.screen, self.difficulty_level),
+        ]
+        
+        # Draw game over screen if needed
+        if self.game_over:
+            rects.extend(self.ui.draw_game_over(self.screen, self.trombone_played))
+            
+        if self.show_perf_overlay:
+            overlay_rect = self.ui.draw_perf_overlay(self.screen, self.profiler)
+            if overlay_rect is not None:
+                rects.append(overlay_rect)
+        return rects
+        
+    def draw_full(self, count):
+        """Redraw the whole screen and flip it, returning the UI rects"""
         # Clear the screen
         self.screen.fill((0, 0, 0))
         
         # Draw visible portion of world
-        visible_area = pygame.Rect(self.camera.x, self.camera.y, Settings.SCREEN_WIDTH, Settings.SCREEN_HEIGHT)
-        self.screen.blit(self.world.surface, (0, 0), visible_area)
-        
-        # Draw player
-        if self.player.alive:
-            player_image = self.player.get_image()
-            self.screen.blit(player_image, self.camera.world_to_screen(self.player.rect))
-            
-            # Draw health bar above player
-            health_bar_width = 60
-            health_bar_height = 8
-            health_bar_x = self.camera.world_to_screen(self.player.rect).centerx - health_bar_width // 2
-            health_bar_y = self.camera.world_to_screen(self.player.rect).top - 15
-            self.ui.draw_health_bar(
-                self.screen, health_bar_x, health_bar_y, 
-                health_bar_width, health_bar_height, 
-                self.player.health, Settings.PLAYER_MAX_HEALTH
-            )
+        self.world.draw(self.screen, self.camera)
         
-        # Draw spits
-        for spit in self.spits:
-            self.screen.blit(spit.image, self.camera.world_to_screen(spit.rect))
+        # All queued sprites go to SDL in a single call
+        self.screen.blits(itertools.islice(self.render_queue, count), doreturn=False)
             
-        # Draw enemies and their spits
-        for enemy in self.enemies:
-            self.screen.blit(enemy.get_image(), self.camera.world_to_screen(enemy.rect))
-            
-        for spit in self.enemy_spits:
-            self.screen.blit(spit.image, self.camera.world_to_screen(spit.rect))
-            
-        # Draw items
-        for coin in self.coins:
-            coin.draw(self.screen, self.camera)
-            
-        for potion in self.potions:
-            potion.draw(self.screen, self.camera)
-            
-        # Draw UI elements
-        self.ui.draw_score(self.screen, self.score)
-        self.ui.draw_difficulty(self.screen, self.difficulty_level)
+        ui_rects = self.draw_ui()
         
-        # Draw game over screen if needed
-        if self.game_over:
-            self.ui.draw_game_over(self.screen, self.trombone_played)
-            
         # Update the display
         pygame.display.flip()
-        
+        return ui_rects
+        
+    def draw(self, alpha=1.0):
+        """Draw all game elements, interpolated alpha of the way into the latest tick"""
+        self.camera.interpolate(alpha)
+        count = self.collect_sprites(alpha)
+        if self.dirty_renderer is not None:
+            self.profiler.set_counts(dirty_rects=self.dirty_renderer.render(self, count))
+        else:
+            self.draw_full(count)
+        
+    def run_frame(self, draw=True, ticks=1, alpha=1.0):
+        """Handle events, run simulation ticks, play sounds and optionally draw one frame, timing each phase"""
+        profiler = self.profiler
+        start = time.perf_counter()
+        self.handle_events()
+        profiler.add('events', start)
+        
+        # Nothing more is simulated once a quit has been requested
+        if not self.running:
+            ticks = 0
+        start = time.perf_counter()
+        for _ in range(ticks):
+            self.update()
+        profiler.add('update', start)
+        # Once per frame, so catch-up frames report every tick's allocations
+        self.record_allocations()
+        
+        # Sounds queued by this frame's events and ticks
+        start = time.perf_counter()
+        profiler.set_counts(ticks=ticks, sounds=self.sound_manager.update())
+        profiler.add('audio', start)
+        
+        if draw:
+            start = time.perf_counter()
+            self.draw(alpha)
+            profiler.add('draw', start)
+            
     def run(self):
-        """Main game loop"""
+        """Main game loop: fixed-rate simulation ticks, with rendering interpolated between them"""
+        tick_seconds = 1 / Settings.TICK_RATE
+        accumulator = 0.0
+        previous = time.perf_counter()
         while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(Settings.FPS)
+            self.profiler.begin_frame()
+            if self.headless:
+                # Headless runs are uncapped: one tick per frame, as fast as possible
+                ticks = 1
+                alpha = 1.0
+            else:
+                now = time.perf_counter()
+                accumulator += now - previous
+                previous = now
+                ticks = int(accumulator / tick_seconds)
+                if ticks > Settings.MAX_TICKS_PER_FRAME:
+                    # Drop the backlog so the game slows down rather than spiralling
+                    ticks = Settings.MAX_TICKS_PER_FRAME
+                    accumulator = ticks * tick_seconds
+                accumulator -= ticks * tick_seconds
+                alpha = accumulator / tick_seconds if Settings.INTERPOLATE else 1.0
+                
+            draw = self.profiler.frame_index % self.quality['draw_interval'] == 0
+            self.run_frame(draw=draw, ticks=ticks, alpha=alpha)
+            if self.profiler.frame_index == 0:
+                self.startup_timer.mark('first frame')
+                logger.info(self.startup_timer.report())
+            if not self.headless:
+                start = time.perf_counter()
+                self.clock.tick(Settings.FPS)
+                self.profiler.add('tick', start)
+            record = self.profiler.end_frame()
+            if self.telemetry is not None:
+                self.telemetry.write(self, record)
+            if self.governor is not None:
+                tier = self.governor.observe(record)
+                if tier is not None:
+                    self.set_quality(tier)
             
+        if self.governor is not None:
+            # Sessions that had to degrade are reported by default, steady ones only with --timings
+            log = logger.warning if self.governor.changes else logger.info
+            log(self.governor.report())
+        if self.recorder is not None:
+            self.recorder.close()
         pygame.quit()
+        
+    def simulate(self, frames=None, draw=False, realtime=False):
+        """Run frames (one tick each) until done or quit, returning the total ms per phase
+        
+        Frames run as fast as possible unless realtime paces them at Settings.TICK_RATE.
+        """
+        totals = {'total': 0.0}
+        frame = 0
+        while self.running and (frames is None or frame < frames):
+            self.profiler.begin_frame()
+            self.run_frame(draw)
+            if realtime:
+                self.clock.tick(Settings.TICK_RATE)
+            record = self.profiler.end_frame()
+            if self.telemetry is not None:
+                self.telemetry.write(self, record)
+            totals['total'] += record['total']
+            for phase, ms in record['phases'].items():
+                totals[phase] = totals.get(phase, 0.0) + ms
+            frame += 1
+        totals['frames'] = frame
+        return totals
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Llama Spitter")
+    parser.add_argument('--headless', action='store_true',
+                        help="simulate without a window or audio, driven by synthetic input")
+    parser.add_argument('--frames', type=int, default=3600,
+                        help="number of frames to simulate in headless mode")
+    parser.add_argument('--draw', action='store_true',
+                        help="also render each frame in headless mode")
+    parser.add_argument('--seed', type=int, help="seed for the random number generator")
+    parser.add_argument('--record', metavar='FILE', help="record the session's seed and input to FILE")
+    parser.add_argument('--replay', metavar='FILE', help="play back a recorded session")
+    parser.add_argument('--telemetry', metavar='FILE',
+                        help="stream per-frame timings to FILE (CSV if it ends in .csv, else JSON lines)")
+    parser.add_argument('--fast', action='store_true', help="replay as fast as possible instead of in real time")
+    parser.add_argument('--no-draw', action='store_true', help="replay without rendering (implies --fast)")
+    parser.add_argument('--timings', action='store_true', help="log startup and reset timing reports")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="redraw only changed screen areas while the camera is still")
+    parser.add_argument('--fps', type=int, help="render rate cap (0 for uncapped)")
+    parser.add_argument('--tick-rate', type=int, help="fixed simulation ticks per second")
+    return parser.parse_args()
 
 
 # Start the game when this script is run
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO if args.timings else logging.WARNING, format='%(message)s')
+    if args.dirty_rects:
+        Settings.DIRTY_RECT_RENDERING = True
+    if args.fps is not None:
+        Settings.FPS = args.fps
+    if args.tick_rate is not None:
+        Settings.TICK_RATE = args.tick_rate
+        
+    if args.replay:
+        replay = ReplayInput(args.replay)
+        Settings.TICK_RATE = replay.tick_rate
+        draw = not args.no_draw
+        game = Game(headless=args.no_draw or args.headless, input_source=replay, seed=replay.seed,
+                    telemetry_path=args.telemetry)
+        start = time.perf_counter()
+        totals = game.simulate(draw=draw, realtime=not (args.fast or args.no_draw))
+        elapsed = time.perf_counter() - start
+        ticks = len(replay.ticks)
+        print(f"Replayed {ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:.0f} ticks/s), "
+              f"score {game.score}, difficulty {game.difficulty_level}")
+        print("  " + "  ".join(f"{phase} {ms / totals['frames']:.3f} ms/frame"
+                               for phase, ms in totals.items() if phase != 'frames'))
+        pygame.quit()
+    elif args.headless:
+        game = Game(headless=True, input_source=ScriptedInput(wander_script), seed=args.seed,
+                    record_path=args.record, telemetry_path=args.telemetry)
+        start = time.perf_counter()
+        game.simulate(args.frames, draw=args.draw)
+        elapsed = time.perf_counter() - start
+        print(f"Simulated {args.frames} frames in {elapsed:.2f}s "
+              f"({args.frames / elapsed:.0f} frames/s), score {game.score}")
+        if game.recorder is not None:
+            game.recorder.close()
+        pygame.quit()
+    else:
+        game = Game(seed=args.seed, record_path=args.record, telemetry_path=args.telemetry)
+        game.run()
+        
+    if game.telemetry is not None:
+        print(game.telemetry.close())